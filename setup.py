@@ -13,6 +13,7 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/seobaeksol/xml-generator",
     packages=setuptools.find_packages(),
+    entry_points={"console_scripts": ["xml-generator=xml_generator.cli:main"]},
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
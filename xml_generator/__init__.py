@@ -1 +1,28 @@
-from .types import XmlNode, XmlBuilder, XmlParser, FoldingType
+from .types import (
+    XmlNode,
+    ElementXmlNode,
+    ClonedXmlNode,
+    XmlBuilder,
+    XmlParser,
+    NamespaceTable,
+    XmlBatch,
+    XmlChange,
+    FoldingType,
+    OutputMode,
+    ChangeType,
+)
+from .validation import ValidationIssue, XmlValidationError, XmlValidator
+from .streaming import (
+    convert_extended_query,
+    iter_json_events,
+    load_extended_query,
+    load_xml,
+)
+from .references import ReferenceGraph
+from .sharding import (
+    merge_shards,
+    merge_trees,
+    split_document,
+    write_merged_shards,
+    write_shards,
+)
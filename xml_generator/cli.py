@@ -0,0 +1,316 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import IO, NamedTuple, Sequence
+
+from .streaming import convert_extended_query, load_xml
+from .types import OutputMode, XmlNode
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+XML_SUFFIXES = (".xml", ".arxml")
+JSON_SUFFIXES = (".json",)
+
+COMMANDS = {
+    # command: (input suffixes, output suffix or None to keep the input suffix)
+    "to-json": (XML_SUFFIXES, ".json"),
+    "to-xml": (JSON_SUFFIXES, ".xml"),
+    "reformat": (XML_SUFFIXES, None),
+    "minify": (XML_SUFFIXES, None),
+}
+
+
+class ConversionResult(NamedTuple):
+    """
+    Statistics of one converted file.
+    peak_memory is the peak of the process that converted the file so far,
+    not of the file alone. error is set if the conversion failed.
+    """
+
+    source: str
+    target: str
+    input_bytes: int
+    output_bytes: int
+    nodes: int
+    seconds: float
+    peak_memory: int | None
+    error: str | None = None
+
+
+def convert_file(
+    command: str,
+    source: str,
+    target: str,
+    indent_size: int = 4,
+    declaration: bool = True,
+) -> ConversionResult:
+    """
+    Convert one file with a command of COMMANDS and return its statistics.
+    XML is parsed in chunks, JSON to XML is converted with convert_extended_query()
+    without building the tree. The target is removed if the conversion fails.
+    """
+    start = time.perf_counter()
+    directory = os.path.dirname(target)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    try:
+        nodes = _convert(command, source, target, indent_size, declaration)
+    except BaseException:
+        if os.path.exists(target):
+            os.remove(target)
+        raise
+
+    return ConversionResult(
+        source,
+        target,
+        os.path.getsize(source),
+        os.path.getsize(target),
+        nodes,
+        time.perf_counter() - start,
+        peak_memory(),
+    )
+
+
+def _convert(
+    command: str, source: str, target: str, indent_size: int, declaration: bool
+) -> int:
+    """Convert one file and return the number of nodes."""
+    if command == "to-xml":
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            nodes = convert_extended_query(
+                src, dst, declaration=declaration, indent_size=indent_size
+            )
+    else:
+        with open(source, "rb") as src:
+            root = load_xml(src, chunk_size=1 << 20)
+        nodes = _count_nodes(root)
+        if command == "to-json":
+            with open(target, "w", encoding="utf-8") as dst:
+                json.dump(
+                    root.to_extended_query(),
+                    dst,
+                    ensure_ascii=False,
+                    indent=indent_size or None,
+                )
+        else:
+            mode = OutputMode.MINIFIED if command == "minify" else OutputMode.PRETTY
+            with open(target, "wb") as dst:
+                root.write_xml(
+                    dst, declaration=declaration, indent_size=indent_size, mode=mode
+                )
+    return nodes
+
+
+def _count_nodes(root: XmlNode) -> int:
+    count = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children or ())
+    return count
+
+
+def peak_memory(children: bool = False) -> int | None:
+    """
+    Return the peak resident memory in bytes of this process, or of its finished
+    child processes with children. None where the resource module is not available.
+    """
+    if resource is None:
+        return None
+
+    usage = resource.getrusage(
+        resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    )
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+
+
+def find_jobs(command: str, source: str, target: str) -> list[tuple[str, str]]:
+    """
+    Return the (source, target) paths to convert in a stable order.
+    A source directory is walked recursively and mirrored into the target directory.
+    """
+    suffixes, output_suffix = COMMANDS[command]
+
+    def target_of(path: str, root: str) -> str:
+        if output_suffix is not None:
+            path = os.path.splitext(path)[0] + output_suffix
+        return os.path.join(root, path)
+
+    if os.path.isfile(source):
+        if os.path.isdir(target):
+            return [(source, target_of(os.path.basename(source), target))]
+        return [(source, target)]
+
+    jobs = []
+    for directory, directories, files in os.walk(source):
+        directories.sort()
+        for name in sorted(files):
+            if name.lower().endswith(suffixes):
+                path = os.path.join(directory, name)
+                jobs.append((path, target_of(os.path.relpath(path, source), target)))
+    return jobs
+
+
+def run(
+    command: str,
+    jobs: Sequence[tuple[str, str]],
+    workers: int = None,
+    max_pending: int = None,
+    indent_size: int = 4,
+    declaration: bool = True,
+    output: IO | None = sys.stderr,
+) -> list[ConversionResult]:
+    """
+    Convert the jobs in a pool of worker processes and report every file to output.
+    Each worker reads, converts and writes its own file, so reading, conversion and
+    writing of different files overlap. At most max_pending files are submitted at
+    once (twice the workers by default) and results are reported in the job order.
+    A failed file is reported with its error and the other files are still converted.
+    With one worker, the files are converted in this process.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 2
+    results = []
+    start = time.perf_counter()
+
+    def report(result: ConversionResult) -> None:
+        results.append(result)
+        if output is not None:
+            print(_format_result(result), file=output)
+
+    if workers == 1:
+        for source, target in jobs:
+            try:
+                result = convert_file(command, source, target, indent_size, declaration)
+            except Exception as e:
+                result = _failure(source, target, e)
+            report(result)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending: deque[tuple[str, str, Future]] = deque()
+
+            def collect() -> None:
+                source, target, future = pending.popleft()
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = _failure(source, target, e)
+                report(result)
+
+            for source, target in jobs:
+                if len(pending) >= max_pending:
+                    collect()
+                future = executor.submit(
+                    convert_file, command, source, target, indent_size, declaration
+                )
+                pending.append((source, target, future))
+            while pending:
+                collect()
+
+    if output is not None:
+        print(_format_total(results, time.perf_counter() - start), file=output)
+    return results
+
+
+def _failure(source: str, target: str, error: Exception) -> ConversionResult:
+    return ConversionResult(
+        source, target, 0, 0, 0, 0.0, None, f"{type(error).__name__}: {error}"
+    )
+
+
+def _throughput(input_bytes: int, nodes: int, seconds: float) -> str:
+    seconds = max(seconds, 1e-9)
+    return f"{input_bytes / seconds / 1e6:.2f} MB/s, {nodes / seconds:.0f} nodes/s"
+
+
+def _format_memory(size: int | None) -> str:
+    return "n/a" if size is None else f"{size / 1e6:.1f} MB"
+
+
+def _format_result(result: ConversionResult) -> str:
+    if result.error is not None:
+        return f"{result.source} -> {result.target}: failed: {result.error}"
+    return (
+        f"{result.source} -> {result.target}: {result.input_bytes} bytes, "
+        f"{result.nodes} nodes in {result.seconds:.3f}s "
+        f"({_throughput(result.input_bytes, result.nodes, result.seconds)}), "
+        f"worker peak memory {_format_memory(result.peak_memory)}"
+    )
+
+
+def _format_total(results: list[ConversionResult], seconds: float) -> str:
+    input_bytes = sum(result.input_bytes for result in results)
+    nodes = sum(result.nodes for result in results)
+    failed = sum(1 for result in results if result.error is not None)
+    peaks = [peak for peak in (peak_memory(), peak_memory(children=True)) if peak]
+    return (
+        f"Total: {len(results) - failed} files, {failed} failed, "
+        f"{input_bytes} bytes, {nodes} nodes "
+        f"in {seconds:.3f}s ({_throughput(input_bytes, nodes, seconds)}), "
+        f"peak memory {_format_memory(max(peaks) if peaks else None)}"
+    )
+
+
+def main(argv: Sequence[str] = None) -> int:
+    """Entry point of the xml-generator command."""
+    parser = argparse.ArgumentParser(
+        prog="xml-generator",
+        description="Convert XML and extended query JSON files or directories.",
+    )
+    parser.add_argument(
+        "command",
+        choices=COMMANDS,
+        help="to-json: XML to extended query JSON, to-xml: JSON to XML, "
+        "reformat: pretty print XML, minify: minify XML",
+    )
+    parser.add_argument("source", help="source file or directory")
+    parser.add_argument("target", help="target file or directory")
+    parser.add_argument(
+        "-j", "--workers", type=int, help="worker processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        help="files in flight at once (default: twice the workers)",
+    )
+    parser.add_argument(
+        "--indent", type=int, default=4, help="indent size (default: 4)"
+    )
+    parser.add_argument(
+        "--no-declaration",
+        action="store_true",
+        help="do not write the XML declaration",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="do not report throughput"
+    )
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.source):
+        parser.error(f"{args.source} does not exist")
+
+    jobs = find_jobs(args.command, args.source, args.target)
+    if not jobs:
+        parser.error(f"no files to convert in {args.source}")
+
+    results = run(
+        args.command,
+        jobs,
+        workers=args.workers,
+        max_pending=args.max_pending,
+        indent_size=args.indent,
+        declaration=not args.no_declaration,
+        output=None if args.quiet else sys.stderr,
+    )
+    return 1 if any(result.error is not None for result in results) else 0
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+from .types import ChangeType, XmlChange, XmlNode, is_valid_value_type
+
+SHORT_NAME = "SHORT-NAME"
+REFERENCE_SUFFIXES = ("-REF", "-TREF")
+
+
+def is_reference(node: XmlNode) -> bool:
+    """Return True if the node is an AUTOSAR reference like PROVIDED-INTERFACE-TREF."""
+    return node.name.endswith(REFERENCE_SUFFIXES) and is_valid_value_type(node.body)
+
+
+def short_name_of(node: XmlNode) -> str | None:
+    """Return the SHORT-NAME of an identifiable node, None for other nodes."""
+    for child in node.children or ():
+        if child.name == SHORT_NAME and is_valid_value_type(child.body):
+            return str(child.body)
+    return None
+
+
+class ReferenceGraph:
+    """
+    Index of the references (*-REF and *-TREF nodes) of a tree and their targets.
+    Identifiable nodes (nodes with a SHORT-NAME) are indexed by their SHORT-NAME path
+    like /Demo/Interfaces/DoorStatus, references by the path in their body.
+    The graph is built in one pass and kept up to date with the changes of XmlBatch.
+    Ex)
+    graph = ReferenceGraph(root)
+    interface = graph.find("/Demo/Interfaces/DoorStatus")
+    graph.referrers(interface)
+    graph.rename(interface, "DoorState")
+    """
+
+    def __init__(self, root: XmlNode) -> None:
+        self.root = root
+        self._build()
+
+    def _build(self) -> None:
+        # Every node of a path in document order, the first one is the target
+        self._targets: dict[str, list[XmlNode]] = {}
+        self._paths: dict[int, str] = {}
+        # Identifiable paths and references grouped by their closest identifiable ancestor
+        self._child_paths: dict[str, set[str]] = {}
+        self._scoped_references: dict[str, dict[int, XmlNode]] = {}
+        self._reference_scopes: dict[int, str] = {}
+        self._reference_paths: dict[int, str] = {}
+        self._referrers: dict[str, dict[int, XmlNode]] = {}
+        self._index(self.root, "")
+
+    def find(self, path: str) -> XmlNode | None:
+        """
+        Return the identifiable node with the given SHORT-NAME path,
+        the first one in document order if the path is not unique.
+        """
+        nodes = self._targets.get(path)
+        return nodes[0] if nodes else None
+
+    def path(self, node: XmlNode) -> str | None:
+        """Return the SHORT-NAME path of an identifiable node."""
+        return self._paths.get(id(node))
+
+    @property
+    def references(self) -> list[XmlNode]:
+        """Return every reference node of the tree."""
+        return [
+            reference
+            for references in self._scoped_references.values()
+            for reference in references.values()
+        ]
+
+    def resolve(self, reference: XmlNode) -> XmlNode | None:
+        """Return the target of a reference node, None if it is dangling."""
+        return self.find(self._reference_paths[id(reference)])
+
+    def referrers(self, target: XmlNode | str) -> list[XmlNode]:
+        """Return the references to an identifiable node or a SHORT-NAME path."""
+        path = target if isinstance(target, str) else self._paths.get(id(target))
+        return list(self._referrers.get(path, {}).values())
+
+    def dangling(self) -> list[XmlNode]:
+        """Return the references whose target does not exist."""
+        return [
+            reference
+            for path, references in self._referrers.items()
+            if path not in self._targets
+            for reference in references.values()
+        ]
+
+    def impact(self, node: XmlNode) -> list[XmlNode]:
+        """Return the references to an identifiable node or to any of its descendants."""
+        references = []
+        stack = [self._paths[id(node)]]
+        while stack:
+            path = stack.pop()
+            references.extend(self._referrers.get(path, {}).values())
+            stack.extend(self._child_paths.get(path, ()))
+        return references
+
+    def rename(
+        self, node: XmlNode, short_name: str, update_references: bool = True
+    ) -> list[XmlNode]:
+        """
+        Change the SHORT-NAME of an identifiable node and return the references to it
+        or to its descendants. With update_references, they are changed to the new path.
+        """
+        old_path = self._paths[id(node)]
+        new_path = f"{old_path.rpartition('/')[0]}/{short_name}"
+        references = self.impact(node)
+
+        with self.root.batch() as batch:
+            batch.update(
+                next(child for child in node.children if child.name == SHORT_NAME),
+                body=short_name,
+            )
+            if update_references:
+                for reference in references:
+                    path = self._reference_paths[id(reference)]
+                    batch.update(reference, body=new_path + path[len(old_path) :])
+
+        self.update(batch.changes)
+        return references
+
+    def update(self, changes: list[XmlChange]) -> None:
+        """Update the graph with the change log of a XmlBatch."""
+        for change in changes:
+            node = change.node
+            if change.type == ChangeType.UPDATE:
+                if node.name == SHORT_NAME:
+                    self._reindex(node.parent)
+                elif id(node) in self._reference_scopes:
+                    scope = self._reference_scopes[id(node)]
+                    self._remove_reference(node)
+                    if is_reference(node):
+                        self._add_reference(node, scope)
+                else:
+                    self._reindex(node)
+                continue
+
+            if change.type in (ChangeType.REMOVE, ChangeType.MOVE):
+                self._remove_subtree(node)
+                if node.name == SHORT_NAME:
+                    self._reindex(change.old_parent or change.parent)
+
+            if change.type in (ChangeType.INSERT, ChangeType.MOVE):
+                if node.name == SHORT_NAME:
+                    self._reindex(change.parent)
+                else:
+                    self._index(node, self._scope_of(node.parent))
+
+    def _index(self, node: XmlNode, scope: str) -> None:
+        """Index the identifiable nodes and references of a subtree."""
+        stack = [(node, scope)]
+        while stack:
+            node, scope = stack.pop()
+            short_name = short_name_of(node)
+            if short_name is not None:
+                path = f"{scope}/{short_name}"
+                self._add_target(path, node)
+                self._paths[id(node)] = path
+                self._child_paths.setdefault(scope, set()).add(path)
+                scope = path
+            elif is_reference(node):
+                self._add_reference(node, scope)
+                continue
+
+            children = node.children
+            if children:
+                stack.extend((child, scope) for child in reversed(children))
+
+    def _reindex(self, node: XmlNode | None) -> None:
+        """Index the closest identifiable node of a changed node again."""
+        while node is not None and id(node) not in self._paths:
+            node = node.parent
+        if node is None:
+            self._build()
+            return
+
+        self._remove_subtree(node)
+        self._index(node, self._scope_of(node.parent))
+
+    def _scope_of(self, node: XmlNode | None) -> str:
+        """Return the path of the closest identifiable node from node up."""
+        while node is not None:
+            path = self._paths.get(id(node))
+            if path is not None:
+                return path
+            node = node.parent
+        return ""
+
+    def _add_target(self, path: str, node: XmlNode) -> None:
+        nodes = self._targets.setdefault(path, [])
+        if nodes:
+            # Duplicate paths are kept in document order like a full build
+            position = _document_position(node)
+            index = 0
+            while index < len(nodes) and _document_position(nodes[index]) < position:
+                index += 1
+            nodes.insert(index, node)
+        else:
+            nodes.append(node)
+
+    def _remove_subtree(self, node: XmlNode) -> None:
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            path = self._paths.get(id(node))
+            if path is not None:
+                scope = path.rpartition("/")[0]
+                others = [other for other in self._targets[path] if other is not node]
+                self._child_paths.get(scope, set()).discard(path)
+                self._remove_path(path)
+                # Nodes sharing the path share its index entries, so index them again
+                for other in others:
+                    self._index(other, scope)
+                continue
+            if id(node) in self._reference_scopes:
+                self._remove_reference(node)
+                continue
+            stack.extend(node.children or ())
+
+    def _remove_path(self, path: str) -> None:
+        """Remove an identifiable path with the paths and references under it."""
+        for child_path in self._child_paths.pop(path, ()):
+            self._remove_path(child_path)
+        for reference in list(self._scoped_references.get(path, {}).values()):
+            self._remove_reference(reference)
+        self._scoped_references.pop(path, None)
+
+        for node in self._targets.pop(path, ()):
+            self._paths.pop(id(node), None)
+
+    def _add_reference(self, reference: XmlNode, scope: str) -> None:
+        key = id(reference)
+        path = str(reference.body).strip()
+        self._scoped_references.setdefault(scope, {})[key] = reference
+        self._reference_scopes[key] = scope
+        self._reference_paths[key] = path
+        self._referrers.setdefault(path, {})[key] = reference
+
+    def _remove_reference(self, reference: XmlNode) -> None:
+        key = id(reference)
+        scope = self._reference_scopes.pop(key)
+        path = self._reference_paths.pop(key)
+        self._scoped_references[scope].pop(key, None)
+        referrers = self._referrers[path]
+        referrers.pop(key, None)
+        if not referrers:
+            del self._referrers[path]
+
+
+def _document_position(node: XmlNode) -> list[int]:
+    """Return the child indexes from the root to the node."""
+    position = []
+    while node.parent is not None:
+        position.append(next(i for i, c in enumerate(node.parent.children) if c is node))
+        node = node.parent
+    return position[::-1]
@@ -0,0 +1,256 @@
+from __future__ import annotations
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Any, Callable
+
+from .streaming import load_xml
+from .types import OutputMode, Query, XmlNode, is_valid_value_type
+
+SHORT_NAME = "SHORT-NAME"
+
+
+def split_document(
+    root: XmlNode, boundary: Query = "AR-PACKAGE", max_bytes: int = None
+) -> list[XmlNode]:
+    """
+    Split a tree into shards along the outermost nodes matching the boundary query.
+    Without max_bytes every boundary node gets its own shard, otherwise consecutive
+    boundary nodes are packed until their minified size exceeds max_bytes.
+    Other nodes go to the shard of the closest boundary node before them, so merging
+    the shards in order keeps the document order. Each shard has the ancestors of its
+    nodes with their SHORT-NAME, so it is a complete document.
+    The nodes of the shards are shared with the tree through XmlNode.clone().
+    """
+    boundaries, skeleton = _find_boundaries(root, boundary)
+    if not boundaries:
+        return [root.clone()]
+
+    shard_of = {}
+    shard = -1
+    size = 0
+    for node in boundaries:
+        node_size = len(node.to_xml(mode=OutputMode.MINIFIED)) if max_bytes else 0
+        if shard < 0 or max_bytes is None or size + node_size > max_bytes:
+            shard += 1
+            size = 0
+        shard_of[id(node)] = shard
+        size += node_size
+
+    roots: list[XmlNode | None] = [None] * (shard + 1)
+    shard = 0
+
+    def walk(node: XmlNode, parent_copy: Callable[[int], XmlNode] | None) -> None:
+        """Copy the children of a skeleton node into the shards in document order."""
+        nonlocal shard
+        copies = {}
+        short_names = [child for child in node.children if child.name == SHORT_NAME]
+
+        def copy(index: int) -> XmlNode:
+            """Return the copy of the node in a shard, creating it with its ancestors."""
+            if index not in copies:
+                copies[index] = XmlNode(
+                    node.name,
+                    dict(node.attributes),
+                    [child.clone() for child in short_names] or None,
+                )
+                if parent_copy is None:
+                    roots[index] = copies[index]
+                else:
+                    _append(parent_copy(index), copies[index])
+            return copies[index]
+
+        for child in node.children:
+            key = id(child)
+            if child.name == SHORT_NAME:
+                # Already in every copy of the node
+                if key in shard_of:
+                    shard = shard_of[key]
+                    copy(shard)
+            elif key in shard_of:
+                shard = shard_of[key]
+                _append(copy(shard), child.clone())
+            elif key in skeleton:
+                walk(child, copy)
+            else:
+                _append(copy(shard), child.clone())
+
+    walk(root, None)
+    return roots
+
+
+def _find_boundaries(root: XmlNode, boundary: Query) -> tuple[list[XmlNode], set[int]]:
+    """
+    Return the outermost boundary nodes in document order
+    and the ids of their ancestors (the skeleton).
+    """
+    boundaries = []
+    skeleton = set()
+    stack = [(root, None)]
+    while stack:
+        node, path = stack.pop()
+        if node is not root and XmlNode.check(node, boundary):
+            boundaries.append(node)
+            # Mark the ancestors, stopping at the first one that is already marked
+            while path is not None and path[0] not in skeleton:
+                skeleton.add(path[0])
+                path = path[1]
+            continue
+
+        children = node.children
+        if children:
+            path = (id(node), path)
+            stack.extend((child, path) for child in reversed(children))
+
+    return boundaries, skeleton
+
+
+def _append(parent: XmlNode, child: XmlNode) -> None:
+    if not isinstance(parent.body, list):
+        parent.body = [] if parent.body is None else [parent.body]
+    parent.body.append(child)
+    child.parent = parent
+
+
+def write_shards(
+    root: XmlNode,
+    directory: str,
+    boundary: Query = "AR-PACKAGE",
+    max_bytes: int = None,
+    name: str = "shard-{:04d}.xml",
+    **options: Any,
+) -> list[str]:
+    """
+    Split a tree with split_document() and write every shard with XmlNode.write_xml()
+    into the directory. Return the paths of the shards in order.
+    """
+    os.makedirs(directory, exist_ok=True)
+    options.setdefault("declaration", True)
+
+    paths = []
+    for index, shard in enumerate(split_document(root, boundary, max_bytes)):
+        path = os.path.join(directory, name.format(index))
+        with open(path, "wb") as f:
+            shard.write_xml(f, **options)
+        paths.append(path)
+    return paths
+
+
+def merge_trees(roots: list[XmlNode], boundary: Query = None) -> XmlNode:
+    """
+    Merge trees into the first one in order.
+    Nodes with a SHORT-NAME are matched by their name and SHORT-NAME like
+    XmlNode.get_or_create_with_queries(). Other nodes with children only continue
+    the last node of the same level with the same name and attributes, like the
+    ancestors split_document() repeats at the start of each shard, unless they match
+    the boundary query. Everything else is appended, so repeated siblings without
+    a SHORT-NAME are all kept.
+    """
+    merged = roots[0]
+    for root in roots[1:]:
+        _merge_into(merged, root, boundary)
+    return merged
+
+
+def _merge_key(node: XmlNode) -> tuple | None:
+    if node.name == SHORT_NAME and is_valid_value_type(node.body):
+        return (SHORT_NAME,)
+
+    children = node.children
+    if not children:
+        return None
+
+    for child in children:
+        if child.name == SHORT_NAME and is_valid_value_type(child.body):
+            return (node.name, SHORT_NAME, str(child.body))
+
+    attributes = sorted(node.attributes.items(), key=lambda item: item[0])
+    return (node.name, tuple(attributes))
+
+
+def _merge_into(target: XmlNode, source: XmlNode, boundary: Query | None) -> None:
+    identifiable: dict[tuple, XmlNode] = {}
+    last = None
+    for child in target.children or ():
+        key = _merge_key(child)
+        if key is not None and len(key) == 3:
+            # Continue the last one if a SHORT-NAME is repeated
+            identifiable[key] = child
+        if child.name != SHORT_NAME:
+            last = child
+
+    keys = [_merge_key(child) for child in source.children or ()]
+    counts = Counter(keys)
+    first = True
+
+    for child, key in zip(list(source.children or ()), keys):
+        continuation = first and child.name != SHORT_NAME
+        if child.name != SHORT_NAME:
+            first = False
+
+        found = None
+        if key == (SHORT_NAME,):
+            if any(node.name == SHORT_NAME for node in target.children or ()):
+                continue
+        elif key is not None and len(key) == 3:
+            if counts[key] == 1:
+                found = identifiable.get(key)
+        elif (
+            key is not None
+            and continuation
+            and last is not None
+            and _merge_key(last) == key
+            and (boundary is None or not XmlNode.check(child, boundary))
+        ):
+            found = last
+
+        if found is not None:
+            _merge_into(found, child, boundary)
+        else:
+            _append(target, child)
+
+    target.invalidate()
+
+
+def _load_file(path: str) -> XmlNode:
+    with open(path, "rb") as f:
+        return load_xml(f, chunk_size=1 << 20)
+
+
+def merge_shards(
+    paths: list[str], workers: int = None, boundary: Query = None
+) -> XmlNode:
+    """
+    Parse shard files and merge them with merge_trees() in the order of the paths.
+    Each worker process parses and merges a contiguous group of shards, so only one
+    tree per worker is sent back. workers defaults to the CPU count since parsing is
+    CPU bound, and with one worker the shards are parsed in this process.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if workers <= 1:
+        return _merge_files(paths, boundary)
+
+    size = -(-len(paths) // workers)
+    groups = [paths[index : index + size] for index in range(0, len(paths), size)]
+    with ProcessPoolExecutor(max_workers=len(groups)) as executor:
+        roots = list(executor.map(_merge_files, groups, [boundary] * len(groups)))
+
+    return merge_trees(roots, boundary)
+
+
+def _merge_files(paths: list[str], boundary: Query | None) -> XmlNode:
+    return merge_trees([_load_file(path) for path in paths], boundary)
+
+
+def write_merged_shards(
+    paths: list[str],
+    stream: IO,
+    workers: int = None,
+    boundary: Query = None,
+    **options: Any,
+) -> int:
+    """
+    Merge shard files with merge_shards() and write the result with XmlNode.write_xml().
+    Return the number of bytes written.
+    """
+    return merge_shards(paths, workers, boundary).write_xml(stream, **options)
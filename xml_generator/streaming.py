@@ -0,0 +1,356 @@
+from __future__ import annotations
+import codecs
+import re
+from json.decoder import JSONDecodeError, scanstring
+from typing import IO, Any, Iterator
+
+from .types import FoldingType, OutputMode, XmlNode, XmlParser, _ChunkWriter
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER = re.compile(r"-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][-+]?[0-9]+)?")
+_NUMBER_CHARS = re.compile(r"[-+.eE0-9]*")
+_LITERALS = {"true": True, "false": False, "null": None}
+
+JsonEvent = tuple[str, Any]
+
+
+def iter_json_events(stream: IO, chunk_size: int = 65536) -> Iterator[JsonEvent]:
+    """
+    Read a JSON document from a text or binary stream in chunks and yield its events:
+    ("start_map", None), ("map_key", key), ("end_map", None),
+    ("start_array", None), ("end_array", None) and ("value", value).
+    ValueError is raised when a token is out of place, like a missing comma.
+    """
+    decoder = None
+    buffer = ""
+    position = 0
+    eof = False
+    containers = []
+    # The next token: "value", "key", ":", "," (or the end of the container)
+    # and "end" after the top-level value. empty allows closing a new container.
+    expect = "value"
+    empty = False
+
+    def fill() -> bool:
+        """Read the next chunk into the buffer and return False at the end of the stream."""
+        nonlocal decoder, buffer, position, eof
+        if eof:
+            return False
+
+        chunk = stream.read(chunk_size)
+        # Decide the end on the raw read, a partial UTF-8 sequence decodes to ""
+        if not chunk:
+            eof = True
+        if isinstance(chunk, bytes):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder("utf-8-sig")()
+            chunk = decoder.decode(chunk, final=eof)
+        buffer = buffer[position:] + chunk
+        position = 0
+        return not eof
+
+    while True:
+        position = _WHITESPACE.match(buffer, position).end()
+        if position == len(buffer):
+            if fill():
+                continue
+            break
+
+        char = buffer[position]
+        if char == '"':
+            if expect != "value" and expect != "key":
+                raise ValueError(f"Unexpected {char!r} in JSON stream")
+            while True:
+                try:
+                    text, end = scanstring(buffer, position + 1)
+                    break
+                except JSONDecodeError:
+                    if not fill():
+                        raise
+            position = end
+            empty = False
+            if expect == "key":
+                expect = ":"
+                yield "map_key", text
+            else:
+                expect = "," if containers else "end"
+                yield "value", text
+        elif char in "{[":
+            if expect != "value":
+                raise ValueError(f"Unexpected {char!r} in JSON stream")
+            position += 1
+            empty = True
+            if char == "{":
+                containers.append("}")
+                expect = "key"
+                yield "start_map", None
+            else:
+                containers.append("]")
+                yield "start_array", None
+        elif char in "}]":
+            if (
+                not containers
+                or containers[-1] != char
+                or not (expect == "," or (empty and expect != ":"))
+            ):
+                raise ValueError(f"Unexpected {char!r} in JSON stream")
+            containers.pop()
+            position += 1
+            empty = False
+            expect = "," if containers else "end"
+            yield ("end_map" if char == "}" else "end_array"), None
+        elif char == ",":
+            if expect != ",":
+                raise ValueError(f"Unexpected {char!r} in JSON stream")
+            position += 1
+            expect = "key" if containers[-1] == "}" else "value"
+        elif char == ":":
+            if expect != ":":
+                raise ValueError(f"Unexpected {char!r} in JSON stream")
+            position += 1
+            expect = "value"
+        elif expect != "value":
+            raise ValueError(f"Unexpected {char!r} in JSON stream")
+        elif char in "-0123456789":
+            # A number may go on in the next chunk
+            if _NUMBER_CHARS.match(buffer, position).end() == len(buffer) and fill():
+                continue
+            match = _NUMBER.match(buffer, position)
+            if match is None:
+                raise ValueError(f"Unexpected {char!r} in JSON stream")
+            position = match.end()
+            empty = False
+            expect = "," if containers else "end"
+            integer = match.group(1) is None and match.group(2) is None
+            yield "value", int(match.group()) if integer else float(match.group())
+        else:
+            literal = next(
+                (word for word in _LITERALS if buffer.startswith(word, position)), None
+            )
+            if literal is None:
+                if len(buffer) - position < 5 and fill():
+                    continue
+                raise ValueError(f"Unexpected {char!r} in JSON stream")
+            position += len(literal)
+            empty = False
+            expect = "," if containers else "end"
+            yield "value", _LITERALS[literal]
+
+    if containers:
+        raise ValueError("Unexpected end of JSON stream")
+
+
+def load_extended_query(
+    stream: IO, chunk_size: int = 65536
+) -> list[XmlNode] | XmlNode | None:
+    """
+    Return the XmlNode objects of an extended query JSON document read from a stream.
+    The result is the same as XmlNode.from_extended_query(json.load(stream)),
+    but the JSON document is never loaded as dicts and lists.
+    """
+    events = iter_json_events(stream, chunk_size)
+    event, _ = next(events, (None, None))
+    if event is None:
+        raise ValueError("empty JSON document")
+    if event == "start_map":
+        return _load_map(events)
+    if event == "start_array":
+        return _load_array(events)
+
+    raise TypeError("Cannot parse the JSON value into XmlNode, it must be a dict or a list")
+
+
+def load_xml(stream: IO, chunk_size: int = 65536, **options: Any) -> XmlNode:
+    """
+    Return the XmlNode tree of an XML document read from a text or binary stream
+    in chunks. The options, like validator and max_errors, are passed to XmlParser.
+    """
+    parser = XmlParser(**options)
+    while chunk := stream.read(chunk_size):
+        parser.feed(chunk)
+    return parser.close()
+
+
+def _load_body(events: Iterator[JsonEvent]) -> Any:
+    """Return the body of a node from the next JSON value."""
+    event, value = next(events)
+    if event == "value":
+        return value
+    if event == "start_map":
+        return _load_map(events)
+    return _load_array(events)
+
+
+def _load_map(events: Iterator[JsonEvent]) -> XmlNode | None:
+    """Return the node of the first key of a map. Other keys are skipped."""
+    node = None
+    for event, value in events:
+        if event == "end_map":
+            return node
+        if node is None:
+            node = XmlNode.from_query(value)
+            node.body = _load_body(events)
+            node._link_children()
+        else:
+            _skip_value(events)
+
+
+def _load_array(events: Iterator[JsonEvent]) -> list[XmlNode] | None:
+    """Return the nodes of an array, None if it is empty."""
+    nodes = []
+    empty = True
+    for event, value in events:
+        if event == "end_array":
+            return None if empty else nodes
+        empty = False
+
+        if event == "value":
+            if isinstance(value, str):
+                nodes.append(XmlNode.from_query(value))
+        elif event == "start_map":
+            for event, value in events:
+                if event == "end_map":
+                    break
+                node = XmlNode.from_query(value)
+                node.body = _load_body(events)
+                node._link_children()
+                nodes.append(node)
+        else:
+            _skip_container(events)
+
+
+def _skip_value(events: Iterator[JsonEvent]) -> None:
+    event, _ = next(events)
+    if event != "value":
+        _skip_container(events)
+
+
+def _skip_container(events: Iterator[JsonEvent]) -> None:
+    depth = 1
+    for event, _ in events:
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+            if depth == 0:
+                return
+
+
+def convert_extended_query(
+    source: IO,
+    stream: IO,
+    declaration: bool = False,
+    indent_char: str = " ",
+    indent_size: int = 4,
+    declaration_tag: str = '<?xml version="1.0" encoding="utf-8"?>\n',
+    no_content_folding_type: FoldingType = FoldingType.FOLDING,
+    mode: OutputMode = OutputMode.PRETTY,
+    encoding: str | None = "utf-8",
+    buffer_size: int = 65536,
+    chunk_size: int = 65536,
+) -> int:
+    """
+    Convert an extended query JSON document into XML while reading it
+    and return the number of elements written.
+    Only the nodes on the current path are kept in memory, and the output is the same as
+    XmlNode.write_xml() of the loaded nodes, one after another for a list.
+    """
+    writer = _ChunkWriter(stream, encoding, buffer_size)
+    if declaration:
+        writer.append(declaration_tag)
+    converter = _XmlConverter(
+        writer, (indent_char, indent_size, no_content_folding_type, mode)
+    )
+
+    events = iter_json_events(source, chunk_size)
+    event, _ = next(events, (None, None))
+    if event is None:
+        raise ValueError("empty JSON document")
+    if event == "start_map":
+        converter.write_map(events, 0)
+    elif event == "start_array":
+        converter.write_array(events, -1)
+    else:
+        raise TypeError(
+            "Cannot parse the JSON value into XmlNode, it must be a dict or a list"
+        )
+
+    writer.close()
+    return converter.count
+
+
+class _XmlConverter:
+    """Write the XML of extended query JSON events."""
+
+    def __init__(self, writer: _ChunkWriter, options: tuple) -> None:
+        self.writer = writer
+        self.options = options
+        self.count = 0
+
+    def write_node(self, query: str, events: Iterator[JsonEvent], depth: int) -> None:
+        """Write the node of a query whose body is the next JSON value."""
+        node = XmlNode.from_query(query)
+        self.count += 1
+        event, value = next(events)
+        if event == "value":
+            node.body = value
+            node._serialize_content(self.writer, depth, self.options, False)
+            return
+
+        # The tags of a container are written from an empty list body
+        node.body = []
+        tags = []
+        node._serialize_content(tags, depth, self.options, False)
+
+        if event == "start_map":
+            written = self.write_map(events, depth + 1, tags[0])
+        else:
+            written = self.write_array(events, depth, tags[0])
+
+        if written:
+            self.writer.append(tags[1])
+        else:
+            node.body = None
+            node._serialize_content(self.writer, depth, self.options, False)
+
+    def write_map(
+        self, events: Iterator[JsonEvent], depth: int, open_tag: str = None
+    ) -> bool:
+        """Write the node of the first key of a map and return False if it is empty."""
+        written = False
+        for event, value in events:
+            if event == "end_map":
+                return written
+            if written:
+                _skip_value(events)
+                continue
+            if open_tag is not None:
+                self.writer.append(open_tag)
+            self.write_node(value, events, depth)
+            written = True
+
+    def write_array(
+        self, events: Iterator[JsonEvent], depth: int, open_tag: str = None
+    ) -> bool:
+        """Write the nodes of an array and return False if it is empty."""
+        written = False
+        for event, value in events:
+            if event == "end_array":
+                return written
+            if not written and open_tag is not None:
+                self.writer.append(open_tag)
+            written = True
+
+            if event == "value":
+                if isinstance(value, str):
+                    self.count += 1
+                    XmlNode.from_query(value)._serialize_content(
+                        self.writer, depth + 1, self.options, False
+                    )
+            elif event == "start_map":
+                for event, value in events:
+                    if event == "end_map":
+                        break
+                    self.write_node(value, events, depth + 1)
+            else:
+                _skip_container(events)
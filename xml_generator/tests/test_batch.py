@@ -0,0 +1,145 @@
+import unittest
+
+from xml_generator import ChangeType, XmlNode
+from xml_generator.tests.utils import create_sample_node
+
+
+class BatchTestCase(unittest.TestCase):
+    def test_insert(self):
+        """Test XmlBatch.insert() with nodes, queries and indexes."""
+        root = create_sample_node()
+
+        with root.batch() as b:
+            first = b.insert("child0@attr0=value0", index=0)
+            last = b.insert(XmlNode("child3"))
+
+        self.assertEqual(
+            [child.name for child in root.children],
+            ["child0", "child1", "child2", "child3"],
+        )
+        self.assertIs(first.parent, root)
+        self.assertIs(last.parent, root)
+        self.assertEqual(
+            [(change.type, change.index) for change in b.changes],
+            [(ChangeType.INSERT, 0), (ChangeType.INSERT, 3)],
+        )
+
+    def test_remove(self):
+        """Test XmlBatch.remove() with a node and a query."""
+        root = create_sample_node()
+        child1 = root.children[0]
+
+        with root.batch() as b:
+            b.remove(child1)
+            b.remove("child2@attr2=value2")
+
+        self.assertIsNone(root.body)
+        self.assertIsNone(child1.parent)
+        self.assertEqual(
+            [(change.type, change.node.name, change.index) for change in b.changes],
+            [(ChangeType.REMOVE, "child1", 0), (ChangeType.REMOVE, "child2", 1)],
+        )
+
+    def test_move(self):
+        """Test XmlBatch.move() between child lists."""
+        root = create_sample_node()
+        child1, child2 = root.children
+
+        with root.batch() as b:
+            b.move("child2", child1)
+
+        self.assertEqual(root.children, [child1])
+        self.assertEqual(child1.children, [child2])
+        self.assertIs(child2.parent, child1)
+        self.assertEqual(len(b.changes), 1)
+        self.assertEqual(b.changes[0].type, ChangeType.MOVE)
+        self.assertIs(b.changes[0].old_parent, root)
+
+    def test_many_edits_in_one_pass(self):
+        """Test XmlBatch with many removals and inserts on one child list."""
+        root = XmlNode("root", body=[XmlNode("item", {"id": str(i)}) for i in range(1000)])
+
+        with root.batch() as b:
+            for child in root.children[::2]:
+                b.remove(child)
+            b.insert(XmlNode("head"), index=0)
+            b.insert(XmlNode("middle"), index=250)
+
+        self.assertEqual(len(root.children), 502)
+        self.assertEqual(root.children[0].name, "head")
+        self.assertEqual(root.children[1].attributes, {"id": "1"})
+        self.assertEqual(root.children[251].name, "middle")
+        self.assertEqual(root.children[252].attributes, {"id": "501"})
+
+    def test_failed_batch_is_not_applied(self):
+        """Test that a failing XmlBatch leaves the tree untouched."""
+        root = create_sample_node()
+        expected = create_sample_node()
+
+        with self.assertRaises(ValueError):
+            with root.batch() as b:
+                b.insert("child3")
+                b.remove("child4")
+
+        with self.assertRaises(ValueError):
+            with root.batch() as b:
+                b.insert("child3")
+                b.remove(XmlNode("stale", parent=root.children[0]))
+
+        with self.assertRaises(ValueError):
+            with root.batch() as b:
+                b.move(root.children[0], root.children[0])
+
+        self.assertEqual(root, expected)
+
+    def test_insert_attached_node(self):
+        """Test XmlBatch.insert() moves a node that is already in the tree."""
+        root = create_sample_node()
+        child1, child2 = root.children
+
+        with root.batch() as b:
+            b.insert(child2, parent=child1)
+
+        self.assertEqual(root.children, [child1])
+        self.assertEqual(child1.children, [child2])
+        self.assertIs(child2.parent, child1)
+        self.assertEqual(b.changes[0].type, ChangeType.MOVE)
+
+    def test_remove_repeated_query(self):
+        """Test XmlBatch.remove() with the same query removes the next match."""
+        root = XmlNode("root", body=[XmlNode("item", {"id": str(i)}) for i in range(3)])
+
+        with root.batch() as b:
+            b.remove("item")
+            b.remove("item")
+
+        self.assertEqual([child.attributes["id"] for child in root.children], ["2"])
+
+        with self.assertRaises(ValueError):
+            with root.batch() as b:
+                b.remove("item")
+                b.remove("item")
+
+    def test_scheduled_parents(self):
+        """Test that moves are checked against the parents after the batch."""
+        root = create_sample_node()
+        child1, child2 = root.children
+        expected = create_sample_node()
+
+        with self.assertRaises(ValueError):
+            with root.batch() as b:
+                b.move(child1, child2)
+                b.move(child2, child1)
+
+        with self.assertRaises(ValueError):
+            with root.batch() as b:
+                b.remove(child1)
+                b.move(child2, child1)
+
+        with self.assertRaises(ValueError):
+            with root.batch() as b:
+                b.remove(child1)
+                b.insert("child3", parent=child1)
+
+        self.assertEqual(root, expected)
+        self.assertIs(child2.parent, root)
@@ -0,0 +1,153 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from xml.etree import ElementTree
+
+from xml_generator import XmlNode, XmlParser
+from xml_generator.cli import find_jobs, main, run
+
+COMPLEX_XML = "xml_generator/tests/samples/complex.xml"
+PRACTICE_JSON = "xml_generator/tests/samples/practice.json"
+
+
+class CommandLineTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+        self.source = os.path.join(self.directory, "source")
+        os.makedirs(os.path.join(self.source, "nested"))
+        shutil.copy(COMPLEX_XML, os.path.join(self.source, "a.xml"))
+        shutil.copy(COMPLEX_XML, os.path.join(self.source, "nested", "b.arxml"))
+        shutil.copy(PRACTICE_JSON, os.path.join(self.source, "ignored.json"))
+
+        with open(COMPLEX_XML, "r", encoding="utf-8") as f:
+            parser = XmlParser()
+            parser.feed(f.read())
+            self.root = parser.close()
+
+    def test_find_jobs(self):
+        """Test find_jobs() mirrors the source directory into the target."""
+        target = os.path.join(self.directory, "target")
+
+        self.assertEqual(
+            find_jobs("to-json", self.source, target),
+            [
+                (
+                    os.path.join(self.source, "a.xml"),
+                    os.path.join(target, "a.json"),
+                ),
+                (
+                    os.path.join(self.source, "nested", "b.arxml"),
+                    os.path.join(target, "nested", "b.json"),
+                ),
+            ],
+        )
+        self.assertEqual(
+            find_jobs("to-xml", self.source, target),
+            [
+                (
+                    os.path.join(self.source, "ignored.json"),
+                    os.path.join(target, "ignored.xml"),
+                )
+            ],
+        )
+
+    def test_round_trip(self):
+        """Test to-json and to-xml with worker processes give the original XML back."""
+        json_directory = os.path.join(self.directory, "json")
+        xml_directory = os.path.join(self.directory, "xml")
+        output = io.StringIO()
+
+        results = run(
+            "to-json",
+            find_jobs("to-json", self.source, json_directory),
+            workers=2,
+            max_pending=1,
+            output=output,
+        )
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0].nodes, results[1].nodes)
+        self.assertIn("MB/s", output.getvalue())
+        self.assertIn("Total: 2 files", output.getvalue())
+        with open(os.path.join(json_directory, "nested", "b.json"), "rb") as f:
+            self.assertEqual(XmlNode.from_extended_query(json.load(f)), self.root)
+
+        main(["to-xml", json_directory, xml_directory, "-j", "2", "-q"])
+
+        with open(os.path.join(xml_directory, "a.xml"), "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), self.root.to_xml(declaration=True))
+
+    def test_reformat_and_minify(self):
+        """Test reformat and minify of a single file in this process."""
+        source = os.path.join(self.source, "a.xml")
+        pretty = os.path.join(self.directory, "pretty.xml")
+        minified = os.path.join(self.directory, "minified.xml")
+
+        main(["minify", source, minified, "-j", "1", "-q", "--no-declaration"])
+        main(["reformat", minified, pretty, "-j", "1", "-q", "--indent", "2"])
+
+        with open(minified, "r", encoding="utf-8") as f:
+            self.assertNotIn("\n", f.read())
+        with open(pretty, "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), self.root.to_xml(declaration=True, indent_size=2))
+
+    def test_entities(self):
+        """Test that converted files with entities are well-formed."""
+        source = os.path.join(self.directory, "entities.xml")
+        with open(source, "w", encoding="utf-8") as f:
+            f.write('<DESC a="x &amp; &quot;y&quot;">Tom &amp; Jerry &lt;3</DESC>')
+
+        for command in ("minify", "reformat"):
+            target = os.path.join(self.directory, f"{command}.xml")
+            self.assertEqual(main([command, source, target, "-j", "1", "-q"]), 0)
+
+            element = ElementTree.parse(target).getroot()
+            self.assertEqual(element.get("a"), 'x & "y"')
+            self.assertEqual(element.text, "Tom & Jerry <3")
+
+        json_target = os.path.join(self.directory, "entities.json")
+        xml_target = os.path.join(self.directory, "entities-back.xml")
+        main(["to-json", source, json_target, "-j", "1", "-q"])
+        main(["to-xml", json_target, xml_target, "-j", "1", "-q"])
+        self.assertEqual(ElementTree.parse(xml_target).getroot().text, "Tom & Jerry <3")
+
+    def test_failed_file(self):
+        """Test that a broken file is reported without stopping the other files."""
+        with open(os.path.join(self.source, "broken.xml"), "w", encoding="utf-8") as f:
+            f.write("<root><open></root>")
+        target = os.path.join(self.directory, "target")
+        output = io.StringIO()
+
+        results = run(
+            "minify",
+            find_jobs("minify", self.source, target),
+            workers=2,
+            output=output,
+        )
+
+        self.assertEqual([result.error is None for result in results], [True, False, True])
+        self.assertIn("broken.xml", output.getvalue())
+        self.assertIn("1 failed", output.getvalue())
+        self.assertFalse(os.path.exists(os.path.join(target, "broken.xml")))
+        self.assertTrue(os.path.exists(os.path.join(target, "nested", "b.arxml")))
+        self.assertEqual(main(["minify", self.source, target, "-j", "1", "-q"]), 1)
+
+    def test_truncated_file(self):
+        """Test that a truncated file fails instead of writing a partial tree."""
+        truncated = os.path.join(self.directory, "truncated.xml")
+        with open(COMPLEX_XML, "r", encoding="utf-8") as f:
+            document = f.read()
+
+        for text in ("<root><a>x</a><b>", document[:20000]):
+            with open(truncated, "w", encoding="utf-8") as f:
+                f.write(text)
+
+            for command, suffix in (("minify", ".xml"), ("to-json", ".json")):
+                target = os.path.join(self.directory, f"out{suffix}")
+                self.assertEqual(main([command, truncated, target, "-j", "1", "-q"]), 1)
+                self.assertFalse(os.path.exists(target))
@@ -0,0 +1,119 @@
+import unittest
+
+from xml_generator import ClonedXmlNode, XmlNode, XmlParser
+
+
+class CloneTestCase(unittest.TestCase):
+    def setUp(self):
+        parser = XmlParser()
+        with open(
+            file="xml_generator/tests/samples/complex.xml", mode="r", encoding="utf-8"
+        ) as f:
+            parser.feed(f.read())
+        self.root = parser.close()
+        self.expected = self.root.to_xml()
+
+    def test_clone_serialization(self):
+        """Test XmlNode.clone() serializes like the original."""
+        clone = self.root.clone()
+
+        self.assertIsInstance(clone, ClonedXmlNode)
+        self.assertEqual(clone.to_xml(), self.expected)
+        self.assertEqual(clone.to_xml(use_cache=True), self.expected)
+        self.assertEqual(clone, self.root)
+        self.assertEqual(clone.to_extended_query(), self.root.to_extended_query())
+
+    def test_clone_copy_on_write(self):
+        """Test that changing a clone only copies the changed path."""
+        clone = self.root.clone()
+
+        short_name = clone.find("SHORT-NAME")
+        short_name.body = "Renamed"
+        short_name.invalidate()
+        clone.attributes["UUID"] = "1"
+
+        self.assertEqual(self.root.to_xml(), self.expected)
+        self.assertNotIn("UUID", self.root.attributes)
+        self.assertIn("<SHORT-NAME>Renamed</SHORT-NAME>", clone.to_xml())
+        self.assertEqual(
+            clone.to_xml(),
+            self.expected.replace(
+                'autosar_4-1-1.xsd">', 'autosar_4-1-1.xsd" UUID="1">', 1
+            ).replace("<SHORT-NAME>Demo<", "<SHORT-NAME>Renamed<", 1),
+        )
+
+        # Siblings that were not visited are still read from the original
+        package = clone.children[0].children[0]
+        sibling = package.children[1]
+        self.assertIs(sibling.source, self.root.children[0].children[0].children[1])
+        self.assertIsNone(sibling._attributes)
+
+    def test_clone_reads_do_not_copy(self):
+        """Test that searching and serializing a clone copies nothing."""
+        self.root.to_xml(use_cache=True)
+        clone = self.root.clone()
+
+        self.assertIsNone(clone.find("NONEXISTENT"))
+        self.assertEqual(clone.to_xml(use_cache=True), self.expected)
+        self.assertEqual(dict(clone.attributes), self.root.attributes)
+
+        # Unchanged wrappers are serialized by their source nodes
+        self.assertIsNone(clone._xml_cache)
+        stack = [clone]
+        while stack:
+            node = stack.pop()
+            self.assertIsNone(node._attributes)
+            stack.extend(node.children or ())
+
+        package = clone.children[0].children[0]
+        package.attributes["UUID"] = "1"
+        self.assertEqual(package.attributes, {"UUID": "1"})
+        self.assertEqual(self.root.children[0].children[0].attributes, {})
+
+    def test_clone_with_batch(self):
+        """Test XmlBatch on a clone leaves the original untouched."""
+        template = XmlNode.from_extended_query(
+            {
+                "ECU": [
+                    {"SHORT-NAME": "Template"},
+                    {"CONNECTORS": [{"CONNECTOR": [{"SHORT-NAME": "C1"}]}]},
+                ]
+            }
+        )
+        expected = template.to_xml()
+
+        clones = []
+        for index in range(3):
+            clone = template.clone()
+            with clone.batch() as b:
+                b.update("SHORT-NAME", body=f"Ecu{index}")
+                b.insert("EXTRA", parent=clone.find("CONNECTORS"))
+            clones.append(clone)
+
+        self.assertEqual(template.to_xml(), expected)
+        self.assertEqual(
+            [clone.find("SHORT-NAME").body for clone in clones],
+            ["Ecu0", "Ecu1", "Ecu2"],
+        )
+        self.assertEqual(
+            clones[0].to_xml(),
+            expected.replace("Template", "Ecu0").replace(
+                "    </CONNECTORS>", "        <EXTRA/>\n    </CONNECTORS>"
+            ),
+        )
+
+    def test_clone_cache_follows_source(self):
+        """Test the cached XML of a changed clone sees later changes of the source."""
+        self.assertEqual(self.root.to_xml(use_cache=True), self.expected)
+        clone = self.root.clone()
+        with clone.batch() as b:
+            b.update("SHORT-NAME", body="Changed")
+        self.assertEqual(clone.to_xml(use_cache=True), clone.to_xml())
+
+        # A subtree the clone still shares with the source
+        packages = self.root.find("AR-PACKAGES").find("AR-PACKAGE").find("AR-PACKAGES")
+        with self.root.batch() as b:
+            b.update(packages, attributes={"T": "SourceChanged"})
+
+        self.assertIn("SourceChanged", clone.to_xml())
+        self.assertEqual(clone.to_xml(use_cache=True), clone.to_xml())
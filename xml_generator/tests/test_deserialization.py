@@ -1,4 +1,6 @@
 import unittest
+from xml.etree import ElementTree
+
 from xml_generator.types import XmlParser
 
 
@@ -23,3 +25,67 @@ class DeserializationTestCase(unittest.TestCase):
         root2 = parser.close()
 
         self.assertEqual(root, root2)
+
+    def test_entities_round_trip(self):
+        """Test text split at entities and chunks is kept and escaped again."""
+        document = '<DESC a="x &amp; &quot;y&quot;">Tom &amp; Jerry &lt;3</DESC>'
+        parser = XmlParser()
+        for char in document:
+            parser.feed(char)
+        root = parser.close()
+
+        self.assertEqual(root.attributes, {"a": 'x & "y"'})
+        self.assertEqual(root.body, "Tom & Jerry <3")
+        self.assertEqual(
+            root.to_xml(), '<DESC a="x &amp; &quot;y&quot;">Tom &amp; Jerry &lt;3</DESC>'
+        )
+
+
+class NamespaceTestCase(unittest.TestCase):
+    def test_multiple_namespaces(self):
+        """Test XmlParser with prefixed and nested namespace declarations."""
+        xml = """<root xmlns="urn:default" xmlns:a="urn:a" a:id="1" plain="2">
+    <a:child a:kind="x">
+        <inner xmlns="urn:inner" xmlns:b="urn:b" b:ref="y">text</inner>
+    </a:child>
+    <child/>
+</root>"""
+        parser = XmlParser()
+        parser.feed(xml)
+        root = parser.close()
+
+        self.assertEqual(
+            root.attributes,
+            {"xmlns": "urn:default", "xmlns:a": "urn:a", "a:id": "1", "plain": "2"},
+        )
+        self.assertEqual(root.children[0].name, "a:child")
+        self.assertEqual(root.children[0].attributes, {"a:kind": "x"})
+        inner = root.children[0].children[0]
+        self.assertEqual(inner.name, "inner")
+        self.assertEqual(
+            inner.attributes, {"xmlns": "urn:inner", "xmlns:b": "urn:b", "b:ref": "y"}
+        )
+        self.assertEqual(root.children[1].name, "child")
+        self.assertEqual(root.to_xml(), xml)
+        self.assertEqual(parser.namespaces.uris[1:], ["urn:default", "urn:a", "urn:inner", "urn:b"])
+
+    def test_parsers_do_not_share_namespaces(self):
+        """Test that namespaces of one document do not leak into the next one."""
+        parser = XmlParser()
+        parser.feed('<root xmlns:a="urn:a"><a:child/></root>')
+        parser.close()
+
+        parser = XmlParser()
+        parser.feed("<root><child/></root>")
+        root = parser.close()
+
+        self.assertEqual(root.attributes, {})
+        self.assertEqual(root.to_xml(), "<root>\n    <child/>\n</root>")
+
+    def test_incomplete_document(self):
+        """Test XmlParser.close() on a truncated document."""
+        parser = XmlParser()
+        parser.feed("<root><a>x</a><b>")
+
+        with self.assertRaises(ElementTree.ParseError):
+            parser.close()
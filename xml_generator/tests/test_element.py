@@ -0,0 +1,118 @@
+import unittest
+from xml.etree import ElementTree
+
+from xml_generator import ElementXmlNode, XmlNode, XmlParser
+
+AUTOSAR_NS = "http://autosar.org/schema/r4.0"
+XSI_NS = "http://www.w3.org/2001/XMLSchema-instance"
+
+
+class ElementViewTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tree = ElementTree.parse("xml_generator/tests/samples/complex.xml")
+
+        parser = XmlParser()
+        with open(
+            file="xml_generator/tests/samples/complex.xml", mode="r", encoding="utf-8"
+        ) as f:
+            parser.feed(f.read())
+        self.root = parser.close()
+
+    def test_view_matches_parsed_tree(self):
+        """Test XmlNode.from_element() gives the same tree as XmlParser."""
+        view = XmlNode.from_element(
+            self.tree.getroot(), {"": AUTOSAR_NS, "xsi": XSI_NS}
+        )
+
+        self.assertIsInstance(view, ElementXmlNode)
+        self.assertEqual(view, self.root)
+        self.assertEqual(view.to_xml(), self.root.to_xml())
+        self.assertEqual(view.to_extended_query(), self.root.to_extended_query())
+        self.assertEqual(view.find("SHORT-NAME").body, "Demo")
+
+    def test_view_is_lazy(self):
+        """Test that children are only wrapped when they are used."""
+        view = XmlNode.from_element(self.tree.getroot())
+
+        self.assertEqual(view.name, f"{{{AUTOSAR_NS}}}AUTOSAR")
+        self.assertIs(view.to_element(), self.tree.getroot())
+        self.assertIs(view.children[0].element, self.tree.getroot()[0])
+
+    def test_changed_view_to_element(self):
+        """Test XmlNode.to_element() on a changed view keeps the other elements."""
+        view = XmlNode.from_element(
+            self.tree.getroot(), {"": AUTOSAR_NS, "xsi": XSI_NS}
+        )
+        short_name = view.find("SHORT-NAME")
+
+        with view.batch() as b:
+            b.update(short_name, body="Renamed")
+
+        element = view.to_element()
+        self.assertIsNot(element, self.tree.getroot())
+        self.assertEqual(
+            element.find(f".//{{{AUTOSAR_NS}}}SHORT-NAME").text, "Renamed"
+        )
+        self.assertEqual(len(list(element.iter())), len(list(self.tree.getroot().iter())))
+        self.assertEqual(self.tree.getroot().find(f".//{{{AUTOSAR_NS}}}SHORT-NAME").text, "Demo")
+
+    def test_in_place_changes_to_element(self):
+        """Test XmlNode.to_element() keeps in-place changes of attributes and children."""
+        view = XmlNode.from_element(
+            self.tree.getroot(), {"": AUTOSAR_NS, "xsi": XSI_NS}
+        )
+        self.assertIs(view.to_element(), self.tree.getroot())
+
+        view.attributes["xsi:type"] = "Changed"
+        element = view.to_element()
+        self.assertIsNot(element, self.tree.getroot())
+        self.assertEqual(element.get(f"{{{XSI_NS}}}type"), "Changed")
+        self.assertNotIn(f"{{{XSI_NS}}}type", self.tree.getroot().attrib)
+
+        view = XmlNode.from_element(
+            self.tree.getroot(), {"": AUTOSAR_NS, "xsi": XSI_NS}
+        )
+        packages = view.children[0]
+        packages.body.append(XmlNode("NEW"))
+
+        element = view.to_element()
+        self.assertEqual(len(element[0]), len(self.tree.getroot()[0]) + 1)
+        # A new node without a prefix is in the default namespace of the document
+        self.assertEqual(element[0][-1].tag, f"{{{AUTOSAR_NS}}}NEW")
+
+    def test_node_to_element(self):
+        """Test XmlNode.to_element() on a XmlNode tree."""
+        node = XmlNode.from_extended_query(
+            {"root@id=1": [{"child@count=2": 3}, "empty"]}
+        )
+
+        element = node.to_element()
+
+        self.assertEqual(
+            ElementTree.tostring(element, encoding="unicode"),
+            '<root id="1"><child count="2">3</child><empty /></root>',
+        )
+        self.assertEqual(XmlNode.from_element(element).to_xml(), node.to_xml())
+
+    def test_parsed_tree_to_element(self):
+        """Test XmlNode.to_element() gives Clark names like ElementTree.parse()."""
+        element = self.root.to_element()
+        expected = self.tree.getroot()
+
+        self.assertEqual(element.tag, f"{{{AUTOSAR_NS}}}AUTOSAR")
+        self.assertEqual(element.attrib, expected.attrib)
+        self.assertIsNotNone(element.find(f"{{{AUTOSAR_NS}}}AR-PACKAGES"))
+        self.assertEqual(
+            [(e.tag, e.attrib, e.text) for e in element.iter()],
+            [(e.tag, e.attrib, e.text and e.text.strip() or None) for e in expected.iter()],
+        )
+
+        # Declarations are scoped to their element
+        parser = XmlParser()
+        parser.feed('<a xmlns:p="urn:1"><p:b xmlns:p="urn:2" p:c="1"/><p:d/></a>')
+        element = parser.close().to_element()
+
+        self.assertEqual(element.attrib, {})
+        self.assertEqual(element[0].tag, "{urn:2}b")
+        self.assertEqual(element[0].attrib, {"{urn:2}c": "1"})
+        self.assertEqual(element[1].tag, "{urn:1}d")
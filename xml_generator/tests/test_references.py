@@ -0,0 +1,126 @@
+import unittest
+
+from xml_generator import ReferenceGraph, XmlNode, XmlParser
+
+
+class ReferenceGraphTestCase(unittest.TestCase):
+    def setUp(self):
+        parser = XmlParser()
+        with open(
+            file="xml_generator/tests/samples/complex.xml", mode="r", encoding="utf-8"
+        ) as f:
+            parser.feed(f.read())
+        self.root = parser.close()
+        self.graph = ReferenceGraph(self.root)
+
+    def test_resolution(self):
+        """Test ReferenceGraph.resolve() and ReferenceGraph.referrers()."""
+        interface = self.graph.find("/Demo/Interfaces/DoorStatus")
+        reference = self.root.find("PROVIDED-INTERFACE-TREF")
+
+        self.assertEqual(interface.name, "SENDER-RECEIVER-INTERFACE")
+        self.assertEqual(self.graph.path(interface), "/Demo/Interfaces/DoorStatus")
+        self.assertIs(self.graph.resolve(reference), interface)
+        self.assertIn(reference, self.graph.referrers(interface))
+        self.assertEqual(
+            self.graph.referrers(interface),
+            self.graph.referrers("/Demo/Interfaces/DoorStatus"),
+        )
+
+    def test_dangling(self):
+        """Test ReferenceGraph.dangling() reports references outside the document."""
+        dangling = self.graph.dangling()
+
+        self.assertEqual(len(dangling), 10)
+        self.assertTrue(
+            all(reference.body.startswith("/ArcCore/") for reference in dangling)
+        )
+
+    def test_impact_and_rename(self):
+        """Test ReferenceGraph.rename() updates the references under the renamed node."""
+        interfaces = self.graph.find("/Demo/Interfaces")
+        impact = self.graph.impact(interfaces)
+
+        references = self.graph.rename(interfaces, "Contracts")
+
+        self.assertEqual(references, impact)
+        self.assertIsNone(self.graph.find("/Demo/Interfaces/DoorStatus"))
+        interface = self.graph.find("/Demo/Contracts/DoorStatus")
+        self.assertIsNotNone(interface)
+        self.assertEqual(len(self.graph.referrers(interface)), 3)
+        self.assertTrue(
+            all(reference.body.startswith("/Demo/Contracts/") for reference in impact)
+        )
+        self.assertEqual(len(self.graph.dangling()), 10)
+        self.assertEqual(
+            self.root.find("PROVIDED-INTERFACE-TREF").body, "/Demo/Contracts/DoorStatus"
+        )
+
+    def test_rename_without_reference_update(self):
+        """Test ReferenceGraph.rename() reports the references that break."""
+        interface = self.graph.find("/Demo/Interfaces/DoorStatus")
+
+        references = self.graph.rename(interface, "DoorState", update_references=False)
+
+        self.assertEqual(len(references), 9)
+        self.assertEqual(len(self.graph.dangling()), 19)
+        self.assertEqual(self.graph.referrers(interface), [])
+
+    def test_update_with_batch(self):
+        """Test ReferenceGraph.update() with moves, removals and inserts."""
+        interface = self.graph.find("/Demo/Interfaces/DoorStatus")
+        elements = self.graph.find("/Demo/Door").find("ELEMENTS")
+
+        with self.root.batch() as b:
+            b.move(interface, elements)
+        self.graph.update(b.changes)
+
+        self.assertIs(self.graph.find("/Demo/Door/DoorStatus"), interface)
+        self.assertEqual(len(self.graph.dangling()), 19)
+
+        with self.root.batch() as b:
+            b.remove(self.root.find("PROVIDED-INTERFACE-TREF"))
+            b.insert(
+                XmlNode.from_extended_query(
+                    {
+                        "PROVIDED-INTERFACE-TREF@DEST=SENDER-RECEIVER-INTERFACE": "/Demo/Door/DoorStatus"
+                    }
+                ),
+                parent=elements,
+            )
+        self.graph.update(b.changes)
+
+        self.assertEqual(len(self.graph.referrers(interface)), 1)
+        self.assertEqual(len(self.graph.dangling()), 18)
+
+    def test_duplicate_paths(self):
+        """Test that updates with duplicate SHORT-NAME paths match a full build."""
+        root = XmlNode.from_extended_query(
+            {
+                "AUTOSAR": [
+                    {"AR-PACKAGE": [{"SHORT-NAME": "A"}, {"ELEMENTS": ["X"]}]},
+                    {"AR-PACKAGE": [{"SHORT-NAME": "A"}, {"ELEMENTS": ["Y"]}]},
+                    {"PORT": [{"SHORT-NAME": "P"}, {"TARGET-REF": "/A"}]},
+                ]
+            }
+        )
+        first, second, _ = root.children
+        graph = ReferenceGraph(root)
+        self.assertIs(graph.find("/A"), first)
+
+        with root.batch() as b:
+            b.remove(first)
+        graph.update(b.changes)
+
+        self.assertIs(graph.find("/A"), second)
+        self.assertEqual(graph.dangling(), [])
+        self.assertIs(graph.resolve(root.find("TARGET-REF")), second)
+
+        with root.batch() as b:
+            b.insert(first, index=0)
+        graph.update(b.changes)
+
+        rebuilt = ReferenceGraph(root)
+        self.assertIs(graph.find("/A"), first)
+        self.assertIs(rebuilt.find("/A"), first)
+        self.assertEqual(len(graph.referrers(second)), 1)
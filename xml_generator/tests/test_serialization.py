@@ -1,7 +1,9 @@
+import gzip
+import io
 import unittest
 
 from xml_generator.tests.utils import create_sample_node
-from xml_generator.types import FoldingType, XmlNode
+from xml_generator.types import FoldingType, OutputMode, XmlNode, XmlParser
 
 
 class SerializationTestCase(unittest.TestCase):
@@ -81,3 +83,159 @@ class SerializationTestCase(unittest.TestCase):
             root.to_xml(no_content_folding_type=FoldingType.NO_FOLDING_WITH_NEWLINE),
             expected,
         )
+
+
+class CachedSerializationTestCase(unittest.TestCase):
+    def setUp(self):
+        parser = XmlParser()
+        with open(
+            file="xml_generator/tests/samples/complex.xml", mode="r", encoding="utf-8"
+        ) as f:
+            parser.feed(f.read())
+        self.root = parser.close()
+
+    def test_cached_generation(self):
+        """Test XmlNode.to_xml() with use_cache gives the same output."""
+        expected = self.root.to_xml()
+
+        self.assertEqual(self.root.to_xml(use_cache=True), expected)
+        self.assertEqual(self.root.to_xml(use_cache=True), expected)
+        self.assertEqual(
+            self.root.to_xml(indent_size=2, use_cache=True),
+            self.root.to_xml(indent_size=2),
+        )
+
+    def test_cache_shares_child_parts(self):
+        """Test that the cache of a node holds the cached parts of its children."""
+        expected = self.root.to_xml()
+        self.assertEqual(self.root.to_xml(use_cache=True), expected)
+
+        package = self.root.find("AR-PACKAGES")
+        (parts,) = package._xml_cache.values()
+        children = [
+            child_parts
+            for child in package.children
+            if child._xml_cache
+            for child_parts in child._xml_cache.values()
+        ]
+        self.assertTrue(children)
+        self.assertTrue(
+            all(any(part is child for part in parts) for child in children)
+        )
+
+        output = io.BytesIO()
+        self.root.write_xml(output, use_cache=True)
+        self.assertEqual(output.getvalue().decode("utf-8"), expected)
+
+    def test_invalidation_with_batch(self):
+        """Test that a batch update only invalidates the changed path."""
+        self.root.to_xml(use_cache=True)
+        package = self.root.find("AR-PACKAGES")
+        short_name = self.root.find("SHORT-NAME")
+        sibling = short_name.parent.children[1]
+        sibling_cache = sibling._xml_cache
+        self.assertIsNotNone(sibling_cache)
+
+        with self.root.batch() as b:
+            b.update(short_name, body="Renamed")
+
+        self.assertIsNone(package._xml_cache)
+        self.assertIs(sibling._xml_cache, sibling_cache)
+        self.assertEqual(self.root.to_xml(use_cache=True), self.root.to_xml())
+        self.assertIn("<SHORT-NAME>Renamed</SHORT-NAME>", self.root.to_xml(use_cache=True))
+
+    def test_invalidation_with_direct_change(self):
+        """Test XmlNode.invalidate() after changing a body directly."""
+        self.root.to_xml(use_cache=True)
+        short_name = self.root.find("SHORT-NAME")
+
+        short_name.body = "Renamed"
+        short_name.invalidate()
+
+        self.assertEqual(self.root.to_xml(use_cache=True), self.root.to_xml())
+
+    def test_invalidation_with_extended_query(self):
+        """Test that XmlNode.append_extended_query() invalidates the cache."""
+        root = XmlNode.from_extended_query({"root": [{"child": ["leaf"]}]})
+        root.to_xml(use_cache=True)
+
+        root.children[0].append_extended_query([{"SHORT-NAME": "node"}])
+
+        self.assertEqual(root.to_xml(use_cache=True), root.to_xml())
+        self.assertIn("SHORT-NAME", root.to_xml(use_cache=True))
+
+
+class OutputModeTestCase(unittest.TestCase):
+    def test_minified_generation(self):
+        """Test XmlNode.to_xml() with the minified mode."""
+        root = create_sample_node()
+
+        self.assertEqual(
+            root.to_xml(mode=OutputMode.MINIFIED),
+            '<node attr1="value1" attr2="value2"><child1 attr1="value1"/><child2 attr2="value2"/></node>',
+        )
+        self.assertEqual(
+            root.to_xml(
+                mode=OutputMode.MINIFIED,
+                no_content_folding_type=FoldingType.NO_FOLDING_WITH_NEWLINE,
+            ),
+            '<node attr1="value1" attr2="value2"><child1 attr1="value1"></child1><child2 attr2="value2"></child2></node>',
+        )
+
+    def test_escaping(self):
+        """Test that every mode escapes text and attribute values."""
+        node = XmlNode("node", {"a": 'say "a & b"'}, [XmlNode("child", body="1 < 2 & 3")])
+
+        self.assertEqual(
+            node.to_xml(mode=OutputMode.MINIFIED),
+            '<node a="say &quot;a &amp; b&quot;"><child>1 &lt; 2 &amp; 3</child></node>',
+        )
+        self.assertEqual(
+            node.to_xml(),
+            '<node a="say &quot;a &amp; b&quot;">\n'
+            "    <child>1 &lt; 2 &amp; 3</child>\n"
+            "</node>",
+        )
+
+    def test_canonical_generation(self):
+        """Test XmlNode.to_xml() with the canonical mode."""
+        node1 = XmlNode(
+            "node",
+            {"b": "1", "xmlns:xsi": "uri", "a": 'say "a & b"'},
+            [XmlNode("child", body="1 < 2"), XmlNode("empty")],
+        )
+        node2 = XmlNode(
+            "node",
+            {"a": 'say "a & b"', "b": "1", "xmlns:xsi": "uri"},
+            [XmlNode("child", body="1 < 2"), XmlNode("empty")],
+        )
+
+        expected = '<node xmlns:xsi="uri" a="say &quot;a &amp; b&quot;" b="1"><child>1 &lt; 2</child><empty></empty></node>'
+        self.assertEqual(node1.to_xml(mode=OutputMode.CANONICAL), expected)
+        self.assertEqual(node2.to_xml(mode=OutputMode.CANONICAL), expected)
+
+    def test_write_to_compressed_stream(self):
+        """Test XmlNode.write_xml() into a gzip stream with a small buffer."""
+        root = XmlNode.from_extended_query(
+            {"root": [{"item@id=" + str(i): "value"} for i in range(100)]}
+        )
+        buffer = io.BytesIO()
+
+        with gzip.GzipFile(fileobj=buffer, mode="wb") as stream:
+            written = root.write_xml(stream, declaration=True, buffer_size=64)
+
+        expected = root.to_xml(declaration=True).encode("utf-8")
+        self.assertEqual(gzip.decompress(buffer.getvalue()), expected)
+        self.assertEqual(written, len(expected))
+
+    def test_write_with_encoding(self):
+        """Test XmlNode.write_xml() with a text stream and a non UTF-8 encoding."""
+        root = XmlNode("node", body="café")
+
+        text = io.StringIO()
+        root.write_xml(text, mode=OutputMode.MINIFIED, encoding=None)
+        self.assertEqual(text.getvalue(), "<node>café</node>")
+
+        binary = io.BytesIO()
+        root.write_xml(binary, encoding="ascii")
+        self.assertEqual(binary.getvalue(), b"<node>caf&#233;</node>")
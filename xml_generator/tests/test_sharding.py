@@ -0,0 +1,105 @@
+import io
+import os
+import tempfile
+import unittest
+
+from xml_generator import (
+    OutputMode,
+    XmlParser,
+    merge_shards,
+    merge_trees,
+    split_document,
+    write_merged_shards,
+    write_shards,
+)
+
+
+class ShardingTestCase(unittest.TestCase):
+    def setUp(self):
+        parser = XmlParser()
+        with open(
+            file="xml_generator/tests/samples/complex.xml", mode="r", encoding="utf-8"
+        ) as f:
+            parser.feed(f.read())
+        self.root = parser.close()
+        self.expected = self.root.to_xml()
+
+    def test_split_and_merge(self):
+        """Test merge_trees() restores the tree split by split_document()."""
+        for boundary, max_bytes in (
+            ("ELEMENTS", None),
+            ("ELEMENTS", 20000),
+            ("P-PORT-PROTOTYPE", 300),
+            ("SHORT-NAME", None),
+        ):
+            shards = split_document(self.root, boundary, max_bytes)
+
+            self.assertGreater(len(shards), 1)
+            self.assertTrue(all(shard.name == self.root.name for shard in shards))
+            self.assertEqual(merge_trees(shards).to_xml(), self.expected)
+            self.assertEqual(self.root.to_xml(), self.expected)
+
+    def test_repeated_siblings(self):
+        """Test merge_trees() keeps repeated siblings without a SHORT-NAME."""
+        for document, boundary in (
+            ("<root><pkg>a</pkg><item/><pkg>b</pkg><item/><item/></root>", None),
+            ("<root><pkg><x/></pkg><w><i/></w><pkg><y/></pkg><w><i/></w></root>", None),
+            ("<root><pkg><x/></pkg><pkg><y/></pkg></root>", "pkg"),
+        ):
+            parser = XmlParser()
+            parser.feed(document)
+            root = parser.close()
+
+            shards = split_document(root, "pkg")
+
+            self.assertEqual(len(shards), 2)
+            self.assertEqual(
+                merge_trees(shards, boundary).to_xml(mode=OutputMode.MINIFIED),
+                document,
+            )
+
+    def test_max_bytes(self):
+        """Test split_document() packs boundary nodes up to max_bytes."""
+        elements = _find_all(self.root, "ELEMENTS")
+        sizes = [len(node.to_xml(mode=OutputMode.MINIFIED)) for node in elements]
+
+        self.assertEqual(len(split_document(self.root, "ELEMENTS")), len(elements))
+        self.assertEqual(
+            len(split_document(self.root, "ELEMENTS", max_bytes=sum(sizes))), 1
+        )
+
+        shards = split_document(self.root, "ELEMENTS", max_bytes=max(sizes))
+        for shard in shards:
+            size = sum(
+                len(node.to_xml(mode=OutputMode.MINIFIED))
+                for node in _find_all(shard, "ELEMENTS")
+            )
+            self.assertLessEqual(size, max(sizes))
+
+    def test_shard_files(self):
+        """Test write_shards() with merge_shards() in worker processes."""
+        with tempfile.TemporaryDirectory() as directory:
+            paths = write_shards(self.root, directory, "ELEMENTS", max_bytes=20000)
+
+            self.assertEqual(
+                sorted(os.listdir(directory)), [os.path.basename(p) for p in paths]
+            )
+            self.assertEqual(merge_shards(paths, workers=2).to_xml(), self.expected)
+            self.assertEqual(merge_shards(paths, workers=1), self.root)
+            # Workers merge contiguous groups before the groups are merged
+            self.assertEqual(
+                merge_trees(
+                    [merge_shards(paths[:2], workers=1), merge_shards(paths[2:])]
+                ),
+                self.root,
+            )
+
+            output = io.BytesIO()
+            write_merged_shards(paths, output, workers=2)
+            self.assertEqual(output.getvalue().decode("utf-8"), self.expected)
+
+
+def _find_all(node, name):
+    if node.name == name:
+        return [node]
+    return [found for child in node.children or () for found in _find_all(child, name)]
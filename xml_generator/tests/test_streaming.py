@@ -0,0 +1,136 @@
+import io
+import json
+import unittest
+
+from xml_generator import (
+    OutputMode,
+    XmlNode,
+    convert_extended_query,
+    iter_json_events,
+    load_extended_query,
+)
+
+PRACTICE_JSON = "xml_generator/tests/samples/practice.json"
+
+
+class JsonEventTestCase(unittest.TestCase):
+    def test_events_across_chunks(self):
+        """Test iter_json_events() with values split across chunks."""
+        document = '{"a": [1, -2.5e3, true, null, "t\\u00e9xt"], "b": {"c": "café €"}}'
+
+        expected = [
+            ("start_map", None),
+            ("map_key", "a"),
+            ("start_array", None),
+            ("value", 1),
+            ("value", -2.5e3),
+            ("value", True),
+            ("value", None),
+            ("value", "téxt"),
+            ("end_array", None),
+            ("map_key", "b"),
+            ("start_map", None),
+            ("map_key", "c"),
+            ("value", "café €"),
+            ("end_map", None),
+            ("end_map", None),
+        ]
+        for chunk_size in (1, 2, 3, 7, 65536):
+            self.assertEqual(
+                list(iter_json_events(io.StringIO(document), chunk_size)), expected
+            )
+            self.assertEqual(
+                list(iter_json_events(io.BytesIO(document.encode()), chunk_size)),
+                expected,
+            )
+
+    def test_invalid_document(self):
+        """Test iter_json_events() with broken documents."""
+        with self.assertRaises(ValueError):
+            list(iter_json_events(io.StringIO('{"a": [1}')))
+        with self.assertRaises(ValueError):
+            list(iter_json_events(io.StringIO('{"a": [1')))
+
+        for document in (
+            '{"a" "b"}',
+            "[1 2]",
+            '["x",,"y"]',
+            "[1,]",
+            '{"a": 1,}',
+            '{"a":}',
+            '{"a", 1}',
+            "[1]]",
+            "[1] [2]",
+            ",[1]",
+            '{1: "a"}',
+        ):
+            with self.assertRaises(ValueError, msg=document):
+                list(iter_json_events(io.StringIO(document), chunk_size=2))
+
+        for loader in (
+            load_extended_query,
+            lambda source: convert_extended_query(source, io.BytesIO()),
+        ):
+            with self.assertRaisesRegex(ValueError, "empty JSON document"):
+                loader(io.BytesIO(b" \n"))
+
+
+class StreamingLoaderTestCase(unittest.TestCase):
+    def test_load_large_extended_query(self):
+        """Test load_extended_query() gives the same nodes as from_extended_query()."""
+        with open(PRACTICE_JSON, "r", encoding="utf-8") as f:
+            expected = XmlNode.from_extended_query(json.load(f))
+
+        with open(PRACTICE_JSON, "rb") as f:
+            root = load_extended_query(f, chunk_size=4096)
+
+        self.assertEqual(root, expected)
+        self.assertIs(root.children[0].parent, root)
+
+    def test_load_edge_cases(self):
+        """Test load_extended_query() with empty bodies, ignored items and extra keys."""
+        queries = [
+            {"a": {}},
+            {"a": []},
+            {"a": [1, [2], {"b": None}, "c@x=1", {"d": {"e": []}, "f": 1.5}]},
+            ["x", {"y": True}],
+            {"a": {"b": 1, "c": [{"z": 1}]}, "ignored": [1]},
+        ]
+
+        for query in queries:
+            self.assertEqual(
+                load_extended_query(io.StringIO(json.dumps(query)), chunk_size=2),
+                XmlNode.from_extended_query(query),
+            )
+
+    def test_convert_large_extended_query(self):
+        """Test convert_extended_query() writes the same XML as to_xml()."""
+        with open(PRACTICE_JSON, "r", encoding="utf-8") as f:
+            root = XmlNode.from_extended_query(json.load(f))
+
+        output = io.BytesIO()
+        with open(PRACTICE_JSON, "rb") as f:
+            count = convert_extended_query(f, output, declaration=True)
+
+        self.assertEqual(output.getvalue().decode("utf-8"), root.to_xml(declaration=True))
+        self.assertEqual(count, sum(1 for _ in _iter_nodes(root)))
+
+    def test_convert_list(self):
+        """Test convert_extended_query() with a list and the minified mode."""
+        query = ["x", {"y@id=1": [{"z": {}}, "w"]}, 1]
+        output = io.StringIO()
+
+        convert_extended_query(
+            io.StringIO(json.dumps(query)),
+            output,
+            mode=OutputMode.MINIFIED,
+            encoding=None,
+        )
+
+        self.assertEqual(output.getvalue(), '<x/><y id="1"><z/><w/></y>')
+
+
+def _iter_nodes(node):
+    yield node
+    for child in node.children or ():
+        yield from _iter_nodes(child)
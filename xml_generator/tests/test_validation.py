@@ -0,0 +1,93 @@
+import unittest
+
+from xml_generator import XmlNode, XmlParser, XmlValidationError, XmlValidator
+
+RULES = {
+    "AR-PACKAGES": {"children": ["AR-PACKAGE"]},
+    "AR-PACKAGE": {
+        "children": ["SHORT-NAME", "AR-PACKAGES", "ELEMENTS"],
+        "required": ["SHORT-NAME"],
+    },
+    "PROVIDED-INTERFACE-TREF": {
+        "attributes": {
+            "DEST": ["SENDER-RECEIVER-INTERFACE", "CLIENT-SERVER-INTERFACE"]
+        },
+    },
+}
+
+
+def read_complex_xml():
+    with open(
+        file="xml_generator/tests/samples/complex.xml", mode="r", encoding="utf-8"
+    ) as f:
+        return f.read()
+
+
+class ValidationTestCase(unittest.TestCase):
+    def test_valid_tree(self):
+        """Test XmlValidator.validate() with a valid tree."""
+        parser = XmlParser()
+        parser.feed(read_complex_xml())
+
+        self.assertEqual(XmlValidator(RULES).validate(parser.close()), [])
+
+    def test_invalid_tree(self):
+        """Test XmlValidator.validate() reports issues with their paths."""
+        root = XmlNode.from_extended_query(
+            {
+                "AR-PACKAGES": [
+                    {"AR-PACKAGE": [{"SHORT-NAME": "Demo"}]},
+                    {"AR-PACKAGE": ["ELEMENTS", "UNKNOWN"]},
+                    {"PROVIDED-INTERFACE-TREF@DEST=I-SIGNAL": "/Demo/Signal"},
+                ]
+            }
+        )
+
+        issues = XmlValidator(RULES).validate(root)
+
+        self.assertEqual(
+            [(issue.path, issue.message) for issue in issues],
+            [
+                (
+                    "/AR-PACKAGES/PROVIDED-INTERFACE-TREF",
+                    "PROVIDED-INTERFACE-TREF is not allowed in AR-PACKAGES",
+                ),
+                (
+                    "/AR-PACKAGES/AR-PACKAGE[2]/UNKNOWN",
+                    "UNKNOWN is not allowed in AR-PACKAGE",
+                ),
+                ("/AR-PACKAGES/AR-PACKAGE[2]", "Missing required child SHORT-NAME"),
+                (
+                    "/AR-PACKAGES/PROVIDED-INTERFACE-TREF",
+                    "Invalid value 'I-SIGNAL' for attribute DEST",
+                ),
+            ],
+        )
+        self.assertEqual(len(XmlValidator(RULES).validate(root, max_errors=2)), 2)
+
+    def test_strict_validation(self):
+        """Test XmlValidator.validate() with unknown tags in strict mode."""
+        root = XmlNode("AR-PACKAGES", body=[XmlNode("UNKNOWN")])
+
+        issues = XmlValidator({"AR-PACKAGES": {}}, strict=True).validate(root)
+
+        self.assertEqual([issue.path for issue in issues], ["/AR-PACKAGES/UNKNOWN"])
+
+    def test_inline_validation(self):
+        """Test XmlParser with a validator."""
+        rules = dict(RULES)
+        rules["AR-PACKAGE"] = {"children": ["SHORT-NAME"]}
+
+        parser = XmlParser(validator=XmlValidator(rules))
+        parser.feed(read_complex_xml())
+        parser.close()
+
+        self.assertGreater(len(parser.issues), 0)
+        self.assertEqual(
+            parser.issues[0].path, "/AUTOSAR/AR-PACKAGES/AR-PACKAGE/AR-PACKAGES/AR-PACKAGE/ELEMENTS"
+        )
+
+        parser = XmlParser(validator=XmlValidator(rules), max_errors=1)
+        with self.assertRaises(XmlValidationError) as context:
+            parser.feed(read_complex_xml())
+        self.assertEqual(len(context.exception.issues), 1)
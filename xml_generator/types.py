@@ -1,10 +1,16 @@
 from __future__ import annotations
+import codecs
+from collections.abc import MutableMapping
 from enum import Enum
-from typing import Any, override
-from xml.etree.ElementTree import TreeBuilder, XMLParser
+from typing import IO, TYPE_CHECKING, Any, Iterator, NamedTuple, override
+from xml.etree.ElementTree import Element, TreeBuilder, XMLParser
+
+if TYPE_CHECKING:
+    from .validation import ValidationIssue, XmlValidator
 
 
 Query = str
+_UNSET = object()
 QueryDict = dict[Query, dict | str | None]
 
 
@@ -13,6 +19,87 @@ def is_valid_value_type(value):
     return isinstance(value, (str, int, float, bool))
 
 
+def _escape_text(text: str) -> str:
+    """Return the text with XML special characters escaped."""
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def _escape_attribute(value: str) -> str:
+    """Return the attribute value with XML special characters escaped."""
+    value = _escape_text(value)
+    if '"' in value:
+        value = value.replace('"', "&quot;")
+    if "\t" in value:
+        value = value.replace("\t", "&#9;")
+    if "\n" in value:
+        value = value.replace("\n", "&#10;")
+    if "\r" in value:
+        value = value.replace("\r", "&#13;")
+    return value
+
+
+def _iter_parts(parts: list[str | list]) -> Iterator[str]:
+    """Yield the strings of nested parts lists in order."""
+    stack = [iter(parts)]
+    while stack:
+        for part in stack[-1]:
+            if isinstance(part, list):
+                stack.append(iter(part))
+                break
+            yield part
+        else:
+            stack.pop()
+
+
+class _ChunkWriter:
+    """Buffer serialized parts and write them to a stream in encoded chunks."""
+
+    def __init__(self, stream: IO, encoding: str | None, buffer_size: int) -> None:
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.written = 0
+        self._parts: list[str] = []
+        self._size = 0
+        if encoding is None:
+            self._encode = None
+        elif codecs.lookup(encoding).name == "utf-8":
+            # Every str except lone surrogates is valid UTF-8, so skip the error handler
+            self._encode = lambda text: text.encode("utf-8")
+        else:
+            self._encode = lambda text: text.encode(encoding, "xmlcharrefreplace")
+
+    def append(self, part: str) -> None:
+        # Flush before appending so that the last part stays in the buffer for close()
+        if self._size >= self.buffer_size:
+            self._flush(False)
+        self._parts.append(part)
+        self._size += len(part)
+
+    def close(self) -> int:
+        """Write the rest of the buffer without the trailing whitespace."""
+        self._flush(True)
+        return self.written
+
+    def _flush(self, last: bool) -> None:
+        text = "".join(self._parts)
+        if last:
+            text = text.rstrip()
+        self._parts = []
+        self._size = 0
+        if not text:
+            return
+
+        data = text if self._encode is None else self._encode(text)
+        self.stream.write(data)
+        self.written += len(data)
+
+
 class FoldingType(Enum):
     """Enumeration for folding types."""
 
@@ -21,6 +108,28 @@ class FoldingType(Enum):
     NO_FOLDING_WITH_NEWLINE = 2
 
 
+class OutputMode(Enum):
+    """
+    Enumeration for serialization modes.
+    MINIFIED drops indentation and newlines.
+    CANONICAL is minified with sorted attributes and no folding,
+    so equal trees give equal bytes. Text and attribute values are escaped in every mode.
+    """
+
+    PRETTY = 0
+    MINIFIED = 1
+    CANONICAL = 2
+
+
+class ChangeType(Enum):
+    """Enumeration for tree change types."""
+
+    INSERT = 0
+    REMOVE = 1
+    MOVE = 2
+    UPDATE = 3
+
+
 class XmlNode:
     def __init__(
         self,
@@ -33,6 +142,13 @@ class XmlNode:
         self.attributes = attributes if attributes else {}
         self.body = body
         self.parent = parent
+        self._xml_cache: dict[tuple, list] | None = None
+        self._link_children()
+
+    def _link_children(self) -> None:
+        """Point the parent of every child to the XmlNode."""
+        for child in self.children or []:
+            child.parent = self
 
     def __eq__(self, __value: object) -> bool:
         if not isinstance(__value, XmlNode):
@@ -199,55 +315,164 @@ class XmlNode:
         indent_size: int = 4,
         declaration_tag: str = '<?xml version="1.0" encoding="utf-8"?>\n',
         no_content_folding_type: FoldingType = FoldingType.FOLDING,
+        use_cache: bool = False,
+        mode: OutputMode = OutputMode.PRETTY,
     ) -> str:
         """
         Return the XmlNode as an XML string.
+        With use_cache, the output of every subtree is kept for the next call
+        with the same options until the subtree is invalidated.
         TODO: remove tag end spaces
         """
-        xml = declaration_tag if declaration else ""
-        indent = indent_char * indent_size * depth
-        attr = self._attributes_to_xml()
+        parts = [declaration_tag] if declaration else []
+        self._serialize(
+            parts,
+            depth,
+            (indent_char, indent_size, no_content_folding_type, mode),
+            use_cache,
+        )
+        xml = "".join(_iter_parts(parts) if use_cache else parts)
+
+        if depth == 0:
+            xml = xml.strip()
+
+        return xml
+
+    def write_xml(
+        self,
+        stream: IO,
+        declaration: bool = False,
+        indent_char: str = " ",
+        indent_size: int = 4,
+        declaration_tag: str = '<?xml version="1.0" encoding="utf-8"?>\n',
+        no_content_folding_type: FoldingType = FoldingType.FOLDING,
+        use_cache: bool = False,
+        mode: OutputMode = OutputMode.PRETTY,
+        encoding: str | None = "utf-8",
+        buffer_size: int = 65536,
+    ) -> int:
+        """
+        Write the XmlNode as XML into a stream in chunks of about buffer_size characters
+        and return the number of bytes (characters for text streams) written.
+        The stream is binary, like a gzip or zstd writer, unless encoding is None.
+        Characters that the encoding cannot represent are written as character references.
+        """
+        writer = _ChunkWriter(stream, encoding, buffer_size)
+        if declaration:
+            writer.append(declaration_tag)
+        options = (indent_char, indent_size, no_content_folding_type, mode)
+        if use_cache:
+            parts = []
+            self._serialize(parts, 0, options, use_cache)
+            for part in _iter_parts(parts):
+                writer.append(part)
+        else:
+            self._serialize(writer, 0, options, use_cache)
+        return writer.close()
+
+    def _serialize(
+        self, parts: list[str | list], depth: int, options: tuple, use_cache: bool
+    ) -> None:
+        """
+        Append the XML of the XmlNode to parts.
+        With use_cache, a node with children appends its cached parts list, which holds
+        the cached lists of its children instead of copies of their XML, so the cache
+        takes the size of the document once. Use _iter_parts() to read the strings.
+        """
+        if use_cache and self.children is not None:
+            key = (depth, options)
+            if self._xml_cache is None:
+                self._xml_cache = {}
+            elif key in self._xml_cache:
+                parts.append(self._xml_cache[key])
+                return
+
+            fragment = []
+            self._serialize_content(fragment, depth, options, use_cache)
+            self._xml_cache[key] = fragment
+            parts.append(fragment)
+            return
+
+        self._serialize_content(parts, depth, options, use_cache)
+
+    def _serialize_content(
+        self, parts: list[str], depth: int, options: tuple, use_cache: bool
+    ) -> None:
+        indent_char, indent_size, no_content_folding_type, mode = options
+        body = self.body
+
+        if mode == OutputMode.PRETTY:
+            indent = indent_char * indent_size * depth
+            newline = "\n"
+            attr = self._attributes_to_xml()
+        elif mode == OutputMode.MINIFIED:
+            indent = newline = ""
+            attr = self._attributes_to_xml()
+        else:
+            indent = newline = ""
+            attr = self._attributes_to_canonical_xml()
+            no_content_folding_type = FoldingType.NO_FOLDING
+
+        if is_valid_value_type(body):
+            body = _escape_text(body if isinstance(body, str) else str(body))
+
         attr_space = " " if attr else ""
 
-        if self.body is None and no_content_folding_type == FoldingType.FOLDING:
-            xml += f"{indent}<{self.name}{attr_space}{self._attributes_to_xml()}/>\n"
-        elif self.body is None and no_content_folding_type == FoldingType.NO_FOLDING:
-            xml += f"{indent}<{self.name}{attr_space}{self._attributes_to_xml()}></{self.name}>\n"
+        if body is None and no_content_folding_type == FoldingType.FOLDING:
+            parts.append(f"{indent}<{self.name}{attr_space}{attr}/>{newline}")
+        elif body is None and no_content_folding_type == FoldingType.NO_FOLDING:
+            parts.append(
+                f"{indent}<{self.name}{attr_space}{attr}></{self.name}>{newline}"
+            )
         elif (
-            self.body is None
+            body is None
             and no_content_folding_type == FoldingType.NO_FOLDING_WITH_NEWLINE
         ):
-            xml += f"{indent}<{self.name}{attr_space}{self._attributes_to_xml()}>\n{indent}</{self.name}>\n"
-        elif is_valid_value_type(self.body):
-            xml += f"{indent}<{self.name}{attr_space}{self._attributes_to_xml()}>{self.body}</{self.name}>\n"
-        elif isinstance(self.body, list):
-            xml += f"{indent}<{self.name}{attr_space}{self._attributes_to_xml()}>\n"
-            for child in self.body:
-                xml += child.to_xml(
-                    depth + 1,
-                    indent_char=indent_char,
-                    indent_size=indent_size,
-                    no_content_folding_type=no_content_folding_type,
-                )
-            xml += f"{indent}</{self.name}>\n"
-        elif isinstance(self.body, XmlNode):
-            xml += f"{indent}<{self.name}{attr_space}{self._attributes_to_xml()}>\n"
-            xml += self.body.to_xml(
-                depth + 1,
-                indent_char=indent_char,
-                indent_size=indent_size,
-                no_content_folding_type=no_content_folding_type,
+            parts.append(
+                f"{indent}<{self.name}{attr_space}{attr}>{newline}{indent}</{self.name}>{newline}"
             )
-            xml += f"{indent}</{self.name}>\n"
-
-        if depth == 0:
-            xml = xml.strip()
+        elif is_valid_value_type(body):
+            parts.append(
+                f"{indent}<{self.name}{attr_space}{attr}>{body}</{self.name}>{newline}"
+            )
+        elif self.children is not None:
+            parts.append(f"{indent}<{self.name}{attr_space}{attr}>{newline}")
+            for child in self.children:
+                child._serialize(parts, depth + 1, options, use_cache)
+            parts.append(f"{indent}</{self.name}>{newline}")
 
-        return xml
+    def invalidate(self) -> None:
+        """
+        Drop the cached XML of the XmlNode and its ancestors.
+        Call it after changing name, attributes or body directly.
+        """
+        node = self
+        while node is not None:
+            node._xml_cache = None
+            node = node.parent
 
     def _attributes_to_xml(self) -> str:
-        """Return the XmlNode's attributes as an XML string."""
-        return " ".join(f'{key}="{value}"' for key, value in self.attributes.items())
+        """Return the XmlNode's attributes as an escaped XML string."""
+        return " ".join(
+            f'{key}="{_escape_attribute(str(value))}"'
+            for key, value in self.attributes.items()
+        )
+
+    def _attributes_to_canonical_xml(self) -> str:
+        """
+        Return the XmlNode's attributes as an escaped XML string
+        with namespace declarations first and each group sorted by name.
+        """
+        return " ".join(
+            f'{key}="{_escape_attribute(str(value))}"'
+            for key, value in sorted(
+                self.attributes.items(),
+                key=lambda item: (
+                    item[0] != "xmlns" and not item[0].startswith("xmlns:"),
+                    item[0],
+                ),
+            )
+        )
 
     def get_or_create_with_queries(self, queries: list[str]) -> XmlNode:
         """Return the XmlNode with the given names."""
@@ -260,7 +485,9 @@ class XmlNode:
             )
             if found_child is None:
                 found_child = XmlNode.from_query(query)
+                found_child.parent = node
                 node.body.append(found_child)
+                node.invalidate()
             node = found_child
         return node
 
@@ -297,6 +524,7 @@ class XmlNode:
                 return node
             if isinstance(body, (list, dict)):
                 node.body = XmlNode.from_extended_query(body)
+                node._link_children()
                 return node
 
             raise TypeError(
@@ -318,6 +546,7 @@ class XmlNode:
                             nodes.append(node)
                         elif isinstance(value, (list, dict)):
                             node.body = XmlNode.from_extended_query(value)
+                            node._link_children()
                             nodes.append(node)
 
             return nodes
@@ -353,12 +582,28 @@ class XmlNode:
         nodes = XmlNode.from_extended_query(extended_query)
 
         self.body.extend(nodes)
+        for node in nodes:
+            node.parent = self
+        self.invalidate()
 
         return nodes
 
+    def batch(self) -> XmlBatch:
+        """
+        Return a XmlBatch that collects insert, remove and move operations
+        under this node and applies them together when the context exits.
+        ex) with root.batch() as b:
+                b.insert("SHORT-NAME", parent=package)
+                b.remove("OLD-NODE@id=1")
+                b.move(element, new_parent)
+        """
+        return XmlBatch(self)
+
     def __str__(self) -> str:
         body_info = (
-            self.body if isinstance(self.body, str) else f"children={len(self.body)}"
+            f"children={len(self.children)}"
+            if self.children is not None
+            else self.body
         )
 
         return (
@@ -390,77 +635,931 @@ class XmlNode:
 
         raise TypeError(f"Cannot parse {type(self.body)} into XmlNode")
 
+    def clone(self) -> ClonedXmlNode:
+        """
+        Return a copy-on-write copy of the XmlNode.
+        The copy shares every part with the original until it is changed: children are
+        wrapped level by level along the visited path and attributes are copied when
+        first written.
+        """
+        return ClonedXmlNode(self)
 
-class XmlBuilder(TreeBuilder):
-    default_ns = ""
-    ns_stack = []
-    ns_dict = {}
-    current = None
+    @classmethod
+    def from_element(
+        cls, element: Element, namespaces: dict[str, str] = None
+    ) -> ElementXmlNode:
+        """
+        Return a XmlNode view of a xml.etree.ElementTree.Element without copying the tree.
+        namespaces maps prefixes ("" for the default namespace) to URIs and is used
+        to write Clark names ({uri}local) with prefixes.
+        Ex) XmlNode.from_element(tree.getroot(), {"": "http://autosar.org/schema/r4.0"})
+        """
+        return ElementXmlNode(element, namespaces=namespaces)
+
+    def to_element(self) -> Element:
+        """
+        Return the XmlNode as a xml.etree.ElementTree.Element built by the C TreeBuilder.
+        Prefixed names are expanded to Clark names ({uri}local) with the xmlns attributes
+        in scope, and the xmlns attributes are dropped like ElementTree.parse() does.
+        """
+        builder = TreeBuilder()
+        self._build_element(builder, NamespaceTable())
+        return builder.close()
+
+    def _build_element(self, builder: TreeBuilder, namespaces: NamespaceTable) -> None:
+        declared = []
+        attributes = {}
+        for key, value in self.attributes.items():
+            if key == "xmlns" or key.startswith("xmlns:"):
+                prefix = key[6:]
+                namespaces.push(prefix, str(value))
+                declared.append(prefix)
+            else:
+                attributes[key] = value if isinstance(value, str) else str(value)
+
+        tag = namespaces.expand(self.name)
+        builder.start(
+            tag,
+            {
+                namespaces.expand(key, attribute=True): value
+                for key, value in attributes.items()
+            },
+        )
+        if is_valid_value_type(self.body):
+            builder.data(self.body if isinstance(self.body, str) else str(self.body))
+        else:
+            for child in self.children or ():
+                child._build_element(builder, namespaces)
+        builder.end(tag)
+
+        for prefix in reversed(declared):
+            namespaces.pop(prefix)
+
+
+class XmlChange(NamedTuple):
+    """
+    A change applied by XmlBatch.
+    parent is the new parent for INSERT and MOVE, and the former parent for REMOVE.
+    index is the position of the node in the parent's children after the change
+    (before the change for REMOVE, None for UPDATE).
+    """
+
+    type: ChangeType
+    node: XmlNode
+    parent: XmlNode | None
+    index: int | None
+    old_parent: XmlNode | None = None
+
+
+class XmlBatch:
+    """
+    Collect tree mutations and apply them in one pass per affected child list.
+    Updates are applied after the structural changes.
+    Indexes given to insert() and move() are positions among the children that
+    remain after the batch's removals. Nothing is changed if the batch fails.
+    """
+
+    def __init__(self, root: XmlNode) -> None:
+        self.root = root
+        self.changes: list[XmlChange] = []
+        self._parents: dict[int, XmlNode] = {}
+        self._removals: dict[int, dict[int, XmlNode]] = {}
+        self._inserts: dict[int, list[tuple[int | None, XmlNode, XmlNode | None]]] = {}
+        self._scheduled: set[int] = set()
+        self._moved: set[int] = set()
+        self._updates: list[tuple[XmlNode, str | None, dict | None, Any]] = []
+        # Resumable searches of remove() and move() per query
+        self._cursors: dict[str, Iterator[tuple[XmlNode, XmlNode]]] = {}
+
+    def __enter__(self) -> XmlBatch:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.commit()
+
+    def insert(
+        self,
+        node: XmlNode | Query | list | dict,
+        parent: XmlNode = None,
+        index: int = None,
+    ) -> XmlNode | list[XmlNode]:
+        """
+        Schedule node to be inserted into parent (the batch root by default).
+        node can also be a query or an extended query.
+        A node that already has a parent is moved instead, like move().
+        """
+        parent = self.root if parent is None else parent
+        if isinstance(node, XmlNode):
+            if node.parent is not None:
+                return self.move(node, parent, index)
+            nodes = [node]
+        elif isinstance(node, str):
+            nodes = [XmlNode.from_query(node)]
+        else:
+            created = XmlNode.from_extended_query(node)
+            nodes = created if isinstance(created, list) else [created]
+
+        for item in nodes:
+            self._schedule_insert(item, parent, index, None)
+
+        return nodes[0] if isinstance(node, (XmlNode, str)) else nodes
+
+    def remove(self, target: XmlNode | Query) -> XmlNode:
+        """
+        Schedule the given node, or the first node matching a query that is not
+        scheduled yet, to be removed. Calling it again with a query removes the next one.
+        """
+        parent, node = self._locate(target, skip_scheduled=True)
+        self._schedule_removal(node, parent)
+        return node
+
+    def move(
+        self, target: XmlNode | Query, new_parent: XmlNode, index: int = None
+    ) -> XmlNode:
+        """
+        Schedule the given node, or the first node matching a query that is not
+        scheduled yet, to be moved.
+        """
+        parent, node = self._locate(target, skip_scheduled=True)
+
+        ancestor = new_parent
+        while ancestor is not None:
+            if ancestor is node:
+                raise ValueError(f"Cannot move {node} into its own subtree")
+            ancestor = ancestor.parent
+
+        self._schedule_removal(node, parent)
+        self._schedule_insert(node, new_parent, index, parent)
+        self._moved.add(id(node))
+        return node
+
+    def update(
+        self,
+        target: XmlNode | Query,
+        name: str = None,
+        attributes: dict = None,
+        body: Any = _UNSET,
+    ) -> XmlNode:
+        """
+        Schedule the name, attributes or body of the given node, or the first node
+        matching a query, to be replaced.
+        """
+        if target is self.root:
+            node = self.root
+        else:
+            _, node = self._locate(target)
+        self._updates.append((node, name, attributes, body))
+        return node
+
+    def commit(self) -> list[XmlChange]:
+        """Apply the scheduled operations and return the change log."""
+        self._check_parents()
+        results = []
+        # Build every new child list first so that a failure leaves the tree untouched
+        for key, parent in self._parents.items():
+            results.append((parent, *self._merge(parent, key)))
+
+        for parent, body, changes in results:
+            parent.body = body if body else None
+            for change in changes:
+                if change.type == ChangeType.REMOVE:
+                    change.node.parent = None
+                else:
+                    change.node.parent = parent
+            self.changes.extend(changes)
+            parent.invalidate()
+
+        for node, name, attributes, body in self._updates:
+            if name is not None:
+                node.name = name
+            if attributes is not None:
+                node.attributes = attributes
+            if body is not _UNSET:
+                node.body = body
+                node._link_children()
+            node.invalidate()
+            self.changes.append(XmlChange(ChangeType.UPDATE, node, node.parent, None))
+
+        self._parents.clear()
+        self._removals.clear()
+        self._inserts.clear()
+        self._scheduled.clear()
+        self._moved.clear()
+        self._updates.clear()
+        self._cursors.clear()
+
+        return self.changes
+
+    def _check_parents(self) -> None:
+        """
+        Check the parents of the inserted and moved nodes as they will be after the
+        batch, so that no node is moved into its own subtree or into a removed node.
+        """
+        removed = {
+            key
+            for removals in self._removals.values()
+            for key in removals
+            if key not in self._moved
+        }
+        new_parents = {}
+        for key, inserts in self._inserts.items():
+            for _, node, _ in inserts:
+                new_parents[id(node)] = self._parents[key]
+
+        for key, inserts in self._inserts.items():
+            for _, node, _ in inserts:
+                ancestor = self._parents[key]
+                visited = set()
+                while ancestor is not None:
+                    if ancestor is node:
+                        raise ValueError(f"Cannot move {node} into its own subtree")
+                    if id(ancestor) in removed:
+                        raise ValueError(f"Cannot insert {node} into removed {ancestor}")
+                    if id(ancestor) in visited:
+                        break
+                    visited.add(id(ancestor))
+                    ancestor = new_parents.get(id(ancestor), ancestor.parent)
+
+    def _merge(
+        self, parent: XmlNode, key: int
+    ) -> tuple[list[XmlNode], list[XmlChange]]:
+        """Return the new children list of the parent and the changes made to it."""
+        removals = self._removals.get(key, {})
+        inserts = sorted(
+            self._inserts.get(key, []),
+            key=lambda item: float("inf") if item[0] is None else item[0],
+        )
+        children = parent.children or []
+        body = []
+        changes = []
+        pending = 0
+
+        def emit_inserts(limit):
+            nonlocal pending
+            while pending < len(inserts) and (
+                limit is None
+                or (inserts[pending][0] is not None and inserts[pending][0] <= limit)
+            ):
+                _, node, old_parent = inserts[pending]
+                change_type = ChangeType.INSERT if old_parent is None else ChangeType.MOVE
+                changes.append(XmlChange(change_type, node, parent, len(body), old_parent))
+                body.append(node)
+                pending += 1
+
+        removed = 0
+        for old_index, child in enumerate(children):
+            if id(child) in removals:
+                removed += 1
+                if id(child) not in self._moved:
+                    changes.append(XmlChange(ChangeType.REMOVE, child, parent, old_index))
+                continue
+            emit_inserts(old_index - removed)
+            body.append(child)
+        emit_inserts(None)
+
+        if removed != len(removals):
+            missing = next(
+                node
+                for node in removals.values()
+                if not any(child is node for child in children)
+            )
+            raise ValueError(f"{missing} is not a child of {parent}")
+
+        return body, changes
+
+    def _schedule_insert(
+        self,
+        node: XmlNode,
+        parent: XmlNode,
+        index: int | None,
+        old_parent: XmlNode | None,
+    ) -> None:
+        if is_valid_value_type(parent.body):
+            raise ValueError("Cannot insert nodes into a XmlNode with a body string")
+        if index is not None and index < 0:
+            raise ValueError("Batch insert index must not be negative")
+        if old_parent is None:
+            self._claim(node)
+
+        key = id(parent)
+        self._parents.setdefault(key, parent)
+        self._inserts.setdefault(key, []).append((index, node, old_parent))
+
+    def _schedule_removal(self, node: XmlNode, parent: XmlNode) -> None:
+        self._claim(node)
+        key = id(parent)
+        self._parents.setdefault(key, parent)
+        self._removals.setdefault(key, {})[id(node)] = node
+
+    def _claim(self, node: XmlNode) -> None:
+        if id(node) in self._scheduled:
+            raise ValueError(f"{node} is already scheduled in this batch")
+        self._scheduled.add(id(node))
+
+    def _locate(
+        self, target: XmlNode | Query, skip_scheduled: bool = False
+    ) -> tuple[XmlNode, XmlNode]:
+        """
+        Return the parent and the node for the given node or query.
+        With skip_scheduled, a query skips the nodes already scheduled in this batch.
+        """
+        if target is self.root:
+            raise ValueError("Cannot remove or move the batch root")
+
+        if isinstance(target, XmlNode) and target.parent is not None:
+            return target.parent, target
+
+        if isinstance(target, str) and skip_scheduled:
+            # Continue the previous search of the query, the tree does not change
+            # until commit() and the skipped matches are already scheduled
+            cursor = self._cursors.get(target)
+            if cursor is None:
+                cursor = self._cursors[target] = self._iter_matches(target)
+            for parent, node in cursor:
+                if id(node) not in self._scheduled:
+                    return parent, node
+            raise ValueError(f"Cannot find {target} under {self.root}")
+
+        for parent, node in self._iter_matches(target):
+            return parent, node
+
+        raise ValueError(f"Cannot find {target} under {self.root}")
+
+    def _iter_matches(
+        self, target: XmlNode | Query
+    ) -> Iterator[tuple[XmlNode, XmlNode]]:
+        """Yield the parents and the nodes matching the node or query in document order."""
+        stack = [(self.root, child) for child in reversed(self.root.children or [])]
+        while stack:
+            parent, node = stack.pop()
+            if node is target or (
+                isinstance(target, str) and XmlNode.check(node, target)
+            ):
+                yield parent, node
+            stack.extend((node, child) for child in reversed(node.children or []))
+
+
+class NamespaceTable:
+    """
+    Namespaces of a document.
+    URIs are interned to ids in the order they are declared and the prefixes in
+    scope are tracked so that Clark names ({uri}local) can be written as prefixed names.
+    """
+
+    XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
+
+    def __init__(self) -> None:
+        self.uris: list[str] = []
+        self._ids: dict[str, int] = {}
+        self._scopes: dict[str, list[str]] = {}
+        self._splits: dict[str, tuple[int | None, str]] = {}
+        self._tags: dict[str, str] = {}
+        self._attributes: dict[str, str] = {}
+        self.push("xml", self.XML_NAMESPACE)
+
+    def intern(self, uri: str) -> int:
+        """Return the id of the namespace URI."""
+        ns_id = self._ids.get(uri)
+        if ns_id is None:
+            ns_id = self._ids[uri] = len(self.uris)
+            self.uris.append(uri)
+        return ns_id
+
+    def push(self, prefix: str, uri: str) -> None:
+        """Declare a prefix ("" for the default namespace) in a new scope."""
+        self.intern(uri)
+        self._scopes.setdefault(prefix, []).append(uri)
+        self._tags.clear()
+        self._attributes.clear()
+
+    def pop(self, prefix: str) -> None:
+        """Close the innermost scope of a prefix."""
+        self._scopes[prefix].pop()
+        self._tags.clear()
+        self._attributes.clear()
+
+    def uri(self, prefix: str) -> str | None:
+        """Return the URI of a prefix in the current scope."""
+        stack = self._scopes.get(prefix)
+        return stack[-1] if stack else None
+
+    @property
+    def prefixes(self) -> dict[str, str]:
+        """Return the prefixes in the current scope and their URIs."""
+        return {prefix: stack[-1] for prefix, stack in self._scopes.items() if stack}
+
+    def split(self, name: str) -> tuple[int | None, str]:
+        """Return the namespace id and the local name of a Clark name."""
+        split = self._splits.get(name)
+        if split is None:
+            if name[:1] == "{":
+                uri, local = name[1:].split("}", 1)
+                split = (self.intern(uri), local)
+            else:
+                split = (None, name)
+            self._splits[name] = split
+        return split
+
+    def qualify(self, name: str, attribute: bool = False) -> str:
+        """
+        Return the Clark name as written in the current scope: the local name in the
+        default namespace, prefix:local in a prefixed one or the Clark name if undeclared.
+        Attributes never use the default namespace.
+        """
+        cache = self._attributes if attribute else self._tags
+        qualified = cache.get(name)
+        if qualified is not None:
+            return qualified
+
+        ns_id, local = self.split(name)
+        if ns_id is None:
+            qualified = local
+        else:
+            uri = self.uris[ns_id]
+            if not attribute and self.uri("") == uri:
+                qualified = local
+            else:
+                prefix = next(
+                    (
+                        prefix
+                        for prefix, stack in self._scopes.items()
+                        if prefix and stack and stack[-1] == uri
+                    ),
+                    None,
+                )
+                qualified = name if prefix is None else f"{prefix}:{local}"
+
+        cache[name] = qualified
+        return qualified
+
+    def expand(self, name: str, attribute: bool = False) -> str:
+        """Return the Clark name of a name written in the current scope."""
+        if name[:1] == "{":
+            return name
+
+        prefix, _, local = name.rpartition(":")
+        if not prefix and attribute:
+            return name
+
+        uri = self.uri(prefix)
+        return f"{{{uri}}}{local}" if uri else name
+
+
+class ElementXmlNode(XmlNode):
+    """
+    XmlNode view of a xml.etree.ElementTree.Element.
+    The name, attributes and children are read from the element when first used,
+    so parts of the tree that are never visited do not become XmlNode objects.
+    The attributes dict is the element's attrib unless names are mapped to prefixes.
+    Other changes stay in the view, including in-place changes of a mapped attributes
+    dict or of a children list, and to_element() builds a new element once the view
+    or one of its descendants differs from its element.
+    """
+
+    def __init__(
+        self,
+        element: Element,
+        parent: XmlNode = None,
+        namespaces: dict[str, str] | NamespaceTable = None,
+    ) -> None:
+        if isinstance(namespaces, dict):
+            table = NamespaceTable()
+            for prefix, uri in namespaces.items():
+                table.push(prefix, uri)
+            declarations = {
+                f"xmlns:{prefix}" if prefix else "xmlns": uri
+                for prefix, uri in namespaces.items()
+            }
+        else:
+            table = namespaces
+            declarations = None
+
+        self.element = element
+        self.parent = parent
+        self._namespaces = table
+        self._declarations = declarations
+        self._xml_cache = None
+        self._changed = False
+        self._name = None
+        self._attributes = None
+        self._body = _UNSET
+
+    @property
+    def name(self) -> str:
+        if self._name is None:
+            tag = self.element.tag
+            self._name = (
+                self._namespaces.qualify(tag) if self._namespaces is not None else tag
+            )
+        return self._name
+
+    @name.setter
+    def name(self, value: str) -> None:
+        self._name = value
+        self._mark_changed()
+
+    @property
+    def attributes(self) -> dict:
+        if self._attributes is None:
+            self._attributes = self._read_attributes()
+        return self._attributes
+
+    @attributes.setter
+    def attributes(self, value: dict) -> None:
+        self._attributes = value
+        self._mark_changed()
+
+    @property
+    def body(self) -> str | list[XmlNode] | None:
+        if self._body is _UNSET:
+            element = self.element
+            if len(element):
+                self._body = [
+                    ElementXmlNode(child, self, self._namespaces) for child in element
+                ]
+            elif element.text and not element.text.isspace():
+                self._body = element.text
+            else:
+                self._body = None
+        return self._body
+
+    @body.setter
+    def body(self, value: str | list[XmlNode] | None) -> None:
+        self._body = value
+        self._mark_changed()
+
+    def _read_attributes(self) -> dict:
+        """Return the element's attrib, or a copy with names mapped to prefixes."""
+        attrib = self.element.attrib
+        if self._declarations or (
+            self._namespaces is not None and any(key[:1] == "{" for key in attrib)
+        ):
+            attributes = dict(self._declarations or {})
+            for key, value in attrib.items():
+                attributes[self._namespaces.qualify(key, attribute=True)] = value
+            return attributes
+        return attrib
+
+    def _mark_changed(self) -> None:
+        node = self
+        while isinstance(node, ElementXmlNode) and not node._changed:
+            node._changed = True
+            node = node.parent
+
+    def _is_unchanged(self) -> bool:
+        """
+        Return True if the view and its materialized descendants still match the element.
+        Containers handed out by the view are compared since they can be changed in place.
+        """
+        if self._changed:
+            return False
+
+        attributes = self._attributes
+        if (
+            attributes is not None
+            and attributes is not self.element.attrib
+            and attributes != self._read_attributes()
+        ):
+            return False
+
+        body = self._body
+        if not isinstance(body, list):
+            return True
+
+        element = self.element
+        return len(body) == len(element) and all(
+            isinstance(child, ElementXmlNode)
+            and child.element is element[index]
+            and child._is_unchanged()
+            for index, child in enumerate(body)
+        )
 
     @override
-    def start(self, tag, attrs):
-        name = tag.replace(f"{{{self.default_ns}}}", "")
-        # Handle root's namespace
-        if self.current is None:
-            new_attrs = {}
-            if self.default_ns:
-                new_attrs["xmlns"] = self.default_ns
-
-            for prefix, uri in self.ns_dict.items():
-                new_attrs[f"xmlns:{prefix}"] = uri
-
-            for prefix, uri in self.ns_dict.items():
-                for key, value in attrs.items():
-                    if key.startswith(f"{{{uri}}}"):
-                        new_attrs[key.replace(f"{{{uri}}}", f"{prefix}:")] = value
-
-            self.current = XmlNode(name, new_attrs)
+    def to_element(self) -> Element:
+        """Return the backing element, or a new one if the view has been changed."""
+        if self._is_unchanged():
+            return self.element
+        return super().to_element()
+
+    @override
+    def _build_element(self, builder: TreeBuilder, namespaces: NamespaceTable) -> None:
+        if self._is_unchanged():
+            _replay_element(builder, self.element)
             return
 
-        self.current = XmlNode(name, attrs, parent=self.current)
-        if self.current.parent is None:
-            # If the current node is the root node, do nothing
+        table = self._namespaces
+        if table is None:
+            super()._build_element(builder, namespaces)
             return
 
-        if not isinstance(self.current.parent.body, list):
+        # Names are written back as Clark names since ElementTree declares namespaces itself
+        tag = table.expand(self.name)
+        builder.start(
+            tag,
+            {
+                table.expand(key, attribute=True): (
+                    value if isinstance(value, str) else str(value)
+                )
+                for key, value in self.attributes.items()
+                if key != "xmlns" and not key.startswith("xmlns:")
+            },
+        )
+        if is_valid_value_type(self.body):
+            builder.data(self.body if isinstance(self.body, str) else str(self.body))
+        else:
+            for child in self.children or ():
+                child._build_element(builder, table)
+        builder.end(tag)
+
+
+def _replay_element(builder: TreeBuilder, element: Element) -> None:
+    """Feed an element and its descendants into a TreeBuilder."""
+    builder.start(element.tag, element.attrib)
+    if len(element):
+        for child in element:
+            _replay_element(builder, child)
+    elif element.text:
+        builder.data(element.text)
+    builder.end(element.tag)
+
+
+class ClonedXmlNode(XmlNode):
+    """
+    Copy-on-write copy of a XmlNode returned by XmlNode.clone().
+    The name, attributes and children are read from the source node until they are
+    changed: children are wrapped level by level when visited and attributes are
+    copied on the first write. Subtrees whose names, attributes and children still
+    match the source are serialized by the source node, reusing its cached XML, and
+    changed nodes are serialized again each time instead of caching their XML.
+    Unchanged parts follow later changes of the source, so keep the source unchanged
+    while its copies are used.
+    """
+
+    def __init__(self, source: XmlNode, parent: XmlNode = None) -> None:
+        self.source = source
+        self.parent = parent
+        self._xml_cache = None
+        self._name = None
+        self._attributes = None
+        self._body = _UNSET
+
+    @property
+    def name(self) -> str:
+        return self.source.name if self._name is None else self._name
+
+    @name.setter
+    def name(self, value: str) -> None:
+        self._name = value
+
+    @property
+    def attributes(self) -> dict:
+        if self._attributes is None:
+            return _ClonedAttributes(self)
+        return self._attributes
+
+    @attributes.setter
+    def attributes(self, value: dict) -> None:
+        self._attributes = value
+
+    @property
+    def body(self) -> str | list[XmlNode] | XmlNode | None:
+        if self._body is _UNSET:
+            body = self.source.body
+            if isinstance(body, list):
+                self._body = [ClonedXmlNode(child, self) for child in body]
+            elif isinstance(body, XmlNode):
+                self._body = ClonedXmlNode(body, self)
+            else:
+                self._body = body
+        return self._body
+
+    @body.setter
+    def body(self, value: str | list[XmlNode] | XmlNode | None) -> None:
+        self._body = value
+
+    def _is_unchanged(self) -> bool:
+        """Return True if the clone and its wrapped descendants still match the source."""
+        source = self.source
+        if (self._name is not None and self._name != source.name) or (
+            self._attributes is not None and self._attributes != source.attributes
+        ):
+            return False
+
+        body = self._body
+        if body is _UNSET:
+            return True
+
+        source_body = source.body
+        if isinstance(body, list):
+            return (
+                isinstance(source_body, list)
+                and len(body) == len(source_body)
+                and all(
+                    isinstance(child, ClonedXmlNode)
+                    and child.source is source_child
+                    and child._is_unchanged()
+                    for child, source_child in zip(body, source_body)
+                )
+            )
+        if isinstance(body, XmlNode):
+            return (
+                isinstance(body, ClonedXmlNode)
+                and body.source is source_body
+                and body._is_unchanged()
+            )
+        return body == source_body
+
+    @override
+    def _serialize(
+        self, parts: list[str | list], depth: int, options: tuple, use_cache: bool
+    ) -> None:
+        if self._is_unchanged():
+            self.source._serialize(parts, depth, options, use_cache)
+            return
+        # Not cached, since the parts would hold the cached lists of the source
+        # and would not see later changes of the source
+        self._serialize_content(parts, depth, options, use_cache)
+
+
+class _ClonedAttributes(MutableMapping):
+    """
+    Attributes of a ClonedXmlNode that reads the source's attributes
+    and copies them into the clone on the first write.
+    """
+
+    def __init__(self, node: ClonedXmlNode) -> None:
+        self._node = node
+
+    def _read(self) -> dict:
+        node = self._node
+        return node.source.attributes if node._attributes is None else node._attributes
+
+    def _write(self) -> dict:
+        node = self._node
+        if node._attributes is None:
+            node._attributes = dict(node.source.attributes)
+        return node._attributes
+
+    def __getitem__(self, key: str) -> Any:
+        return self._read()[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._write()[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self._write()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._read())
+
+    def __len__(self) -> int:
+        return len(self._read())
+
+    def __repr__(self) -> str:
+        return repr(self._read())
+
+
+class XmlBuilder(TreeBuilder):
+    """
+    Build XmlNode objects from parser events.
+    Namespace declarations are kept as xmlns attributes on the element that declares
+    them and Clark names are written with the prefixes in scope, so the tree
+    serializes back to the same document.
+    """
+
+    def __init__(self, validator: XmlValidator = None, max_errors: int = None) -> None:
+        super().__init__()
+        self.validator = validator
+        self.max_errors = max_errors
+        self.issues: list[ValidationIssue] = []
+        self.namespaces = NamespaceTable()
+        self.root: XmlNode | None = None
+        self.current: XmlNode | None = None
+        self._depth = 0
+        self._declarations: list[tuple[str, str]] = []
+        # The parser splits text at entities and buffer ends, so collect the chunks
+        self._text: list[str] = []
+
+    @override
+    def start(self, tag, attrs):
+        namespaces = self.namespaces
+        name = namespaces.qualify(tag)
+
+        if self._declarations:
+            new_attrs = {
+                f"xmlns:{prefix}" if prefix else "xmlns": uri
+                for prefix, uri in self._declarations
+            }
+            self._declarations = []
+            for key, value in attrs.items():
+                new_attrs[namespaces.qualify(key, attribute=True)] = value
+            attrs = new_attrs
+        elif any(key[:1] == "{" for key in attrs):
+            attrs = {
+                namespaces.qualify(key, attribute=True): value
+                for key, value in attrs.items()
+            }
+
+        self._flush_text()
+        parent = self.current
+        self.current = XmlNode(name, attrs, parent=parent)
+        self._depth += 1
+        if parent is None:
+            # The root node has no parent to be appended to
+            self.root = self.current
+            return
+
+        if not isinstance(parent.body, list):
             # If the parent node's body is not a list, make it a list
-            self.current.parent.body = []
+            parent.body = []
 
         # Append the current node to the parent node's body
-        self.current.parent.body.append(self.current)
+        parent.body.append(self.current)
 
     @override
     def start_ns(self, prefix, uri):
-        if prefix == "":
-            self.default_ns = uri
-        else:
-            self.ns_stack.append((prefix, uri))
-            self.ns_dict[prefix] = uri
+        self.namespaces.push(prefix, uri)
+        self._declarations.append((prefix, uri))
 
     @override
     def end_ns(self, prefix):
-        if prefix != "":
-            self.ns_stack.pop()
+        self.namespaces.pop(prefix)
 
     @override
     def end(self, tag):
+        self._flush_text()
+        self._depth -= 1
+        if self.validator is not None:
+            self._validate(self.current)
+
         if self.current.parent is not None:
             self.current = self.current.parent
 
     @override
     def data(self, data):
-        if not data.isspace():
-            self.current.body = data
+        self._text.append(data)
+
+    def _flush_text(self) -> None:
+        """Set the collected text as the body of the current node unless it has children."""
+        if not self._text:
+            return
+        text = "".join(self._text)
+        self._text = []
+        if not text.isspace() and not isinstance(self.current.body, list):
+            self.current.body = text
 
     @override
-    def close(self):
-        return self.current
+    def close(self) -> XmlNode:
+        """Return the root node, raising ValueError if the document is incomplete."""
+        if self.root is None:
+            raise ValueError("No element found")
+        if self._depth:
+            raise ValueError(f"{self._depth} elements are not closed")
+        return self.root
+
+    def _validate(self, node: XmlNode) -> None:
+        self.issues.extend(self.validator.check_node(node))
+        if self.max_errors is not None and len(self.issues) >= self.max_errors:
+            from .validation import XmlValidationError
+
+            raise XmlValidationError(self.issues[: self.max_errors])
 
 
 class XmlParser(XMLParser):
-    def __init__(self, *, encoding=None) -> None:
-        super().__init__(target=XmlBuilder(), encoding=encoding)
+    """
+    Parse XML into XmlNode objects.
+    With a validator, every element is validated as soon as it ends and the issues
+    are collected in issues. With max_errors, parsing stops with XmlValidationError
+    once that many issues are found.
+    """
+
+    def __init__(
+        self,
+        *,
+        encoding=None,
+        validator: XmlValidator = None,
+        max_errors: int = None,
+    ) -> None:
+        super().__init__(
+            target=XmlBuilder(validator=validator, max_errors=max_errors),
+            encoding=encoding,
+        )
+
+    @property
+    def issues(self) -> list[ValidationIssue]:
+        """Return the validation issues found so far."""
+        return self.target.issues
+
+    @property
+    def namespaces(self) -> NamespaceTable:
+        """Return the namespace table of the document."""
+        return self.target.namespaces
 
     @override
     def close(self) -> XmlNode:
-        return self.target.close()
+        """
+        Finish parsing and return the root node.
+        Raises xml.etree.ElementTree.ParseError if the document is incomplete.
+        """
+        return super().close()
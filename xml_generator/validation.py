@@ -0,0 +1,171 @@
+from __future__ import annotations
+from typing import Any, Callable, NamedTuple
+
+from .types import XmlNode
+
+
+class ValidationIssue(NamedTuple):
+    """A rule violation found by XmlValidator."""
+
+    path: str
+    message: str
+    node: XmlNode
+
+
+class XmlValidationError(ValueError):
+    """Raised when validation stops after too many issues."""
+
+    def __init__(self, issues: list[ValidationIssue]) -> None:
+        self.issues = issues
+        super().__init__(
+            "\n".join(f"{issue.path}: {issue.message}" for issue in issues)
+        )
+
+
+class _CompiledRule(NamedTuple):
+    children: frozenset[str] | None
+    required: tuple[str, ...]
+    attributes: tuple[tuple[str, frozenset[str]], ...]
+
+
+class XmlValidator:
+    """
+    Validate XmlNode trees against per-tag rules.
+    Rules are compiled into lookup tables once and can be reused for many trees.
+    Ex)
+    XmlValidator(
+        {
+            "AR-PACKAGE": {
+                "children": ["SHORT-NAME", "AR-PACKAGES", "ELEMENTS"],
+                "required": ["SHORT-NAME"],
+            },
+            "PROVIDED-INTERFACE-TREF": {
+                "attributes": {"DEST": ["SENDER-RECEIVER-INTERFACE"]},
+            },
+        }
+    )
+    "children" lists the allowed child tags (any tag if omitted), "required" the child
+    tags that must exist and "attributes" the allowed values of attributes.
+    With strict, tags without a rule are reported too.
+    """
+
+    def __init__(self, rules: dict[str, dict], strict: bool = False) -> None:
+        self.strict = strict
+        self._rules = {tag: self._compile(rule) for tag, rule in rules.items()}
+
+    @staticmethod
+    def _compile(rule: dict) -> _CompiledRule:
+        children = rule.get("children")
+        return _CompiledRule(
+            frozenset(children) if children is not None else None,
+            tuple(rule.get("required", ())),
+            tuple(
+                (key, frozenset(values))
+                for key, values in rule.get("attributes", {}).items()
+            ),
+        )
+
+    def validate(self, root: XmlNode, max_errors: int = None) -> list[ValidationIssue]:
+        """
+        Return the issues of the tree in document order.
+        Validation stops once max_errors issues are found.
+        """
+        issues = []
+        # Each stack entry is (node, parent entry) so paths are only built for issues
+        stack = [(root, None)]
+        while stack:
+            entry = stack.pop()
+            node = entry[0]
+            self._check(node, _entry_path, entry, issues)
+            if max_errors is not None and len(issues) >= max_errors:
+                return issues[:max_errors]
+
+            children = node.children
+            if children:
+                stack.extend((child, entry) for child in reversed(children))
+
+        return issues
+
+    def check_node(self, node: XmlNode) -> list[ValidationIssue]:
+        """
+        Return the issues of a single node and its direct children.
+        The path is built from the parent links, which makes it usable while a tree is being built.
+        """
+        issues = []
+        self._check(node, _parent_path, node, issues)
+        return issues
+
+    def _check(
+        self,
+        node: XmlNode,
+        path_of: Callable[[Any], list[XmlNode]],
+        source: Any,
+        issues: list,
+    ) -> None:
+        """Append the issues of the node, building paths with path_of(source) only when needed."""
+        rule = self._rules.get(node.name)
+        if rule is None:
+            if self.strict:
+                issues.append(_issue(path_of(source), f"Unknown tag {node.name}"))
+            return
+
+        for key, values in rule.attributes:
+            value = node.attributes.get(key)
+            if value is not None and value not in values:
+                issues.append(
+                    _issue(path_of(source), f"Invalid value {value!r} for attribute {key}")
+                )
+
+        children = node.children or ()
+        if rule.children is not None:
+            for child in children:
+                if child.name not in rule.children:
+                    issues.append(
+                        _issue(
+                            path_of(source) + [child],
+                            f"{child.name} is not allowed in {node.name}",
+                        )
+                    )
+
+        if rule.required:
+            names = {child.name for child in children}
+            for name in rule.required:
+                if name not in names:
+                    issues.append(_issue(path_of(source), f"Missing required child {name}"))
+
+
+def _entry_path(entry: tuple | None) -> list[XmlNode]:
+    chain = []
+    while entry is not None:
+        chain.append(entry[0])
+        entry = entry[1]
+    chain.reverse()
+    return chain
+
+
+def _parent_path(node: XmlNode) -> list[XmlNode]:
+    chain = []
+    while node is not None:
+        chain.append(node)
+        node = node.parent
+    chain.reverse()
+    return chain
+
+
+def _issue(chain: list[XmlNode], message: str) -> ValidationIssue:
+    """
+    Return an issue with a path like /AUTOSAR/AR-PACKAGES/AR-PACKAGE[2].
+    The position is only given to nodes with preceding siblings of the same name,
+    so the path does not depend on siblings that are not built yet.
+    """
+    steps = [f"/{chain[0].name}"]
+    for parent, node in zip(chain, chain[1:]):
+        position = 1
+        for child in parent.children or ():
+            if child is node:
+                break
+            if child.name == node.name:
+                position += 1
+        steps.append(f"/{node.name}[{position}]" if position > 1 else f"/{node.name}")
+
+    return ValidationIssue("".join(steps), message, chain[-1])